@@ -0,0 +1,70 @@
+"""Micro-benchmarks of the output parsers behind the stats endpoints.
+
+Parses a synthetic ``ovs-ofctl dump-flows`` of ``--flows`` entries and an
+``ip -json -batch`` netstate answer with ``--neighbors`` ARP entries, the
+way switch and host stats read them. Needs no Mininet; run it from the
+backend directory::
+
+    PYTHONPATH=. python benchmarks/parsers.py --flows 100000 --neighbors 10000
+"""
+import argparse
+import json
+import time
+from typing import Callable
+
+from mininet_gui_backend.netstate import parse_netstate
+from mininet_gui_backend.parsing import parse_flow_dump
+
+
+def flow_dump(count: int) -> str:
+    lines = []
+    for index in range(count):
+        lines.append(
+            f" cookie=0x0, duration={index % 1000}.{index % 997:03d}s, table=0, "
+            f"n_packets={index * 3}, n_bytes={index * 180}, idle_timeout=60, priority={index % 65535},"
+            f"ip,in_port=\"s1-eth{index % 48 + 1}\",dl_src=00:00:00:{index >> 16 & 255:02x}:{index >> 8 & 255:02x}:{index & 255:02x},"
+            f"nw_dst=10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255} actions=output:\"s1-eth{index % 47 + 2}\""
+        )
+    return "\n".join(lines)
+
+
+def netstate_output(count: int) -> str:
+    neighbors = [
+        {
+            "dst": f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+            "dev": f"h1-eth{index % 4}",
+            "lladdr": f"00:00:00:{index >> 16 & 255:02x}:{index >> 8 & 255:02x}:{index & 255:02x}",
+            "state": ["REACHABLE" if index % 7 else "STALE"],
+        }
+        for index in range(count)
+    ]
+    routes = [{"dst": "default", "gateway": "10.0.0.254", "dev": "h1-eth0", "flags": []}]
+    links = [{"ifindex": 1, "ifname": "lo", "flags": ["UP"], "mtu": 65536, "operstate": "UNKNOWN", "address": "00:00:00:00:00:00"}]
+    return "\n".join(json.dumps(document) for document in (neighbors, routes, links))
+
+
+def measure(name: str, parse: Callable[[], int], repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parsed = parse()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(f"{name}: {parsed} entries, best {best * 1000:.1f} ms, {parsed / best:,.0f} entries/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flows", type=int, default=100000)
+    parser.add_argument("--neighbors", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    flows = flow_dump(args.flows)
+    measure("dump-flows", lambda: len(parse_flow_dump(flows)), args.repeat)
+    netstate = netstate_output(args.neighbors)
+    measure("netstate neighbors", lambda: len(parse_netstate(netstate)["neighbors"]), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""CPU used by the PTY relay while N terminals sit idle.
+
+Opens ``--terminals`` PTYs, each with a ``sleep`` attached like an idle
+shell prompt, relays them all through :class:`PtyReader` for
+``--seconds`` and reports the CPU time the process spent meanwhile. With
+the fds on ``loop.add_reader`` this should stay close to zero whatever
+the number of terminals. Needs no Mininet; run it from the backend directory::
+
+    PYTHONPATH=. python benchmarks/terminal_idle_cpu.py --terminals 20 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import pty
+import subprocess
+import time
+
+from mininet_gui_backend.terminals import PtyReader
+
+
+async def idle(terminals: int, seconds: float) -> dict:
+    sessions = []
+    for _ in range(terminals):
+        master_fd, slave_fd = pty.openpty()
+        os.set_blocking(master_fd, False)
+        process = subprocess.Popen(["sleep", str(seconds + 60)], stdin=slave_fd, stdout=slave_fd, stderr=slave_fd)
+        os.close(slave_fd)
+        sessions.append((master_fd, process))
+
+    received = 0
+
+    async def send(data: bytes):
+        nonlocal received
+        received += len(data)
+
+    tasks = [asyncio.create_task(PtyReader(master_fd).run(send)) for master_fd, _ in sessions]
+    await asyncio.sleep(0.5)
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    await asyncio.sleep(seconds)
+    cpu = time.process_time() - cpu_started
+    elapsed = time.perf_counter() - started
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for master_fd, process in sessions:
+        process.kill()
+        process.wait()
+        os.close(master_fd)
+    return {"seconds": elapsed, "cpu_seconds": cpu, "bytes": received}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terminals", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(idle(args.terminals, args.seconds))
+    print(
+        f"{args.terminals} idle terminals for {result['seconds']:.1f}s: "
+        f"{result['cpu_seconds'] * 1000:.1f} ms CPU "
+        f"({100 * result['cpu_seconds'] / result['seconds']:.2f}% of one core)"
+    )
+
+
+if __name__ == "__main__":
+    main()
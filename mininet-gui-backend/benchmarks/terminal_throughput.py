@@ -0,0 +1,71 @@
+"""Throughput of the PTY relay for bulk terminal output.
+
+Runs ``head -c <size> /dev/zero`` behind a PTY and relays it through
+:class:`PtyReader` to a sink that only counts bytes, like ``cat`` of a big
+file in a node shell. Needs no Mininet; run it from the backend directory::
+
+    PYTHONPATH=. python benchmarks/terminal_throughput.py --size 256M
+"""
+import argparse
+import asyncio
+import os
+import pty
+import subprocess
+import time
+
+from mininet_gui_backend.terminals import READ_SIZE, PtyReader
+
+
+def parse_size(value: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    value = value.strip().upper()
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+async def relay(size: int, read_size: int) -> dict:
+    master_fd, slave_fd = pty.openpty()
+    os.set_blocking(master_fd, False)
+    # Raw mode on the slave, so the line discipline does not rewrite output.
+    subprocess.run(["stty", "raw", "-echo"], stdin=slave_fd, check=True)
+    process = subprocess.Popen(["head", "-c", str(size), "/dev/zero"], stdout=slave_fd, stderr=slave_fd)
+    os.close(slave_fd)
+    received = 0
+    sends = 0
+
+    async def send(data: bytes):
+        nonlocal received, sends
+        received += len(data)
+        sends += 1
+
+    reader = PtyReader(master_fd, read_size=read_size)
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    await reader.run(send)
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    process.wait()
+    os.close(master_fd)
+    return {"bytes": received, "sends": sends, "seconds": elapsed, "cpu_seconds": cpu}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="128M", help="bytes of output to relay (K/M/G suffixes)")
+    parser.add_argument("--read-size", type=int, default=READ_SIZE, help="bytes per read of the master fd")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    size = parse_size(args.size)
+    for run in range(1, args.repeat + 1):
+        result = asyncio.run(relay(size, args.read_size))
+        rate = result["bytes"] / result["seconds"] / (1 << 20)
+        print(
+            f"run {run}: {result['bytes']} bytes in {result['seconds']:.3f}s "
+            f"({rate:.1f} MiB/s), {result['sends']} sends, {result['cpu_seconds']:.3f}s CPU"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,51 +12,85 @@ Endpoints that add, remove and edit nodes and edges in real time.
 import os
 import pty
 import json
-import select
+import codecs
+import struct
 import asyncio
 import subprocess
 import logging
-import uuid
+import logging.handlers
+import time
 from datetime import datetime, timezone
 from mininet_gui_backend.sniffer import SnifferManager
+from mininet_gui_backend.persistence import TopologyStore
+from mininet_gui_backend.registry import NODE_KINDS, NodeRegistry
+from mininet_gui_backend.links import LinkStore, link_key
+from mininet_gui_backend.events import TopologyEvents
+from mininet_gui_backend.connectivity import (
+    PING_CONCURRENCY,
+    PING_COUNT,
+    PING_TIMEOUT_SECONDS,
+    PingSweep,
+    ReachabilityCache,
+    format_ping_text,
+    ping_matrix,
+)
+from mininet_gui_backend.traffic import IPERF_BASE_PORT, IperfCampaign, TrafficManager, campaign_pairs
+from mininet_gui_backend.ryu_apps import RyuAppCatalog
+from mininet_gui_backend.ports import PortAllocator
+from mininet_gui_backend.convergence import CONVERGENCE_TIMEOUT, SwitchConnectionTracker, expected_switches
+from mininet_gui_backend.logbus import LazyMessage, LogBus, LogPipeline, parse_level
+from mininet_gui_backend.terminals import (
+    FRAME_DATA,
+    FRAME_PAUSE,
+    FRAME_RESIZE,
+    FRAME_RESUME,
+    TerminalManager,
+    TerminalSession,
+    encode_frame,
+)
 import pyshark.ek_field_mapping as ek_field_mapping
 from pyshark.tshark.output_parser.tshark_ek import TsharkEkJsonParser
-from typing import Tuple, Union, Optional, Set
+from typing import Dict, List, Tuple, Union, Optional
 from contextlib import asynccontextmanager
-import pkgutil
 
 from mininet.moduledeps import pathCheck
 
 from mininet.net import Mininet
-from mininet.log import setLogLevel, info, debug as _debug
+from mininet.log import setLogLevel, info
 from mininet.topo import Topo, MinimalTopo
 from mininet.clean import cleanup as mn_cleanup
 from mininet.node import RemoteController, Controller as ReferenceController, NOX, UserSwitch, OVSSwitch, OVSKernelSwitch, OVSBridge, Node
 from mininet_gui_backend.nodes import Ryu
 from mininet.link import TCLink
-from fastapi import FastAPI, HTTPException, File, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, File, Header, UploadFile, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import PlainTextResponse, Response
 
-from mininet_gui_backend.export import build_addressing_plan, export_net_to_script, export_net_to_json
+from mininet_gui_backend.export import AddressingPlanCache, export_net_to_script, export_net_to_json
 from mininet_gui_backend.cli import CLISession
 from mininet_gui_backend.schema import Switch, Host, Controller, Nat, Router
 from mininet_gui_backend.flow_rules import FlowRuleCreate, FlowRuleDelete, build_flow, build_flow_match
-from mininet_gui_backend.utils import (
-    get_interface_stats_path,
-    parse_ip_addrs,
-    parse_flow_match_from_dump,
-    read_interface_counter,
-)
+from mininet_gui_backend.executor import COMMAND_TIMEOUT, NodeExecutor
+from mininet_gui_backend.netstate import async_read_netstate, read_netstate, read_netstates
+from mininet_gui_backend.parsing import format_route, parse_flow_dump, parse_flow_match_from_dump, parse_port_stats
+from mininet_gui_backend.forwarding import PROACTIVE_COOKIE, LinkEnd, flow_table_commands, install_flow_tables, plan_l2_flows
+from mininet_gui_backend.replan import Replanner
+from mininet_gui_backend.routing import PLANNER_PROTO, normalize_route, plan_static_routes, sync_route_tables
+from mininet_gui_backend.utils import get_interface_stats_path, read_interface_counter
 
 LOG_FILE = os.path.join(os.path.dirname(__file__), "mininet.log")
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+LOG_BUS = LogBus()
+LOG_PIPELINE = LogPipeline()
+logger = logging.getLogger(__name__)
+TOPOLOGY_DB = os.environ.get(
+    "MININET_GUI_DB", os.path.join(os.path.dirname(__file__), "topology.sqlite3")
+)
 RYU_APP_DIRS = []
 
-FLOW_FIELDS = [
-    "cookie", "duration", "table", "n_packets", "n_bytes", 
-    "idle_timeout", "priority", "actions"
-]
 
 MONITOR_INTERVAL_SECONDS = 0.5
 
@@ -110,6 +144,40 @@ class HostUpdate(BaseModel):
     default_route_dev: Optional[str] = None
     default_route_ip: Optional[str] = None
 
+class RouteEntry(BaseModel):
+    dst: str
+    via: Optional[str] = None
+    dev: Optional[str] = None
+    src: Optional[str] = None
+    metric: Optional[int] = None
+
+class RouteTableUpdate(BaseModel):
+    routes: List[RouteEntry]
+    dry_run: bool = False
+
+class RouteTablesUpdate(BaseModel):
+    tables: Dict[str, List[RouteEntry]]
+    dry_run: bool = False
+
+class PlanRequest(BaseModel):
+    apply: bool = True
+    full: bool = False
+
+class PlannerUpdate(BaseModel):
+    enabled: bool
+
+class LogLevelUpdate(BaseModel):
+    level: str
+
+class NodePositionsUpdate(BaseModel):
+    positions: Dict[str, Tuple[float, float]]
+
+class PingallRequest(BaseModel):
+    count: int = PING_COUNT
+    timeout: float = PING_TIMEOUT_SECONDS
+    concurrency: int = PING_CONCURRENCY
+    matrix: bool = False
+
 class IperfRequest(BaseModel):
     client: str
     server: str
@@ -119,29 +187,69 @@ class IperfRequest(BaseModel):
     seconds: Optional[int] = 5
     port: Optional[int] = None
 
+class IperfCampaignRequest(BaseModel):
+    pairs: Optional[List[Tuple[str, str]]] = None
+    pattern: Optional[str] = None
+    hosts: Optional[List[str]] = None
+    l4_type: Optional[str] = "TCP"
+    udp_bw: Optional[str] = None
+    seconds: Optional[int] = 5
+    base_port: Optional[int] = IPERF_BASE_PORT
+    interval: Optional[float] = None
+    wait: bool = False
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # start
     mn_cleanup()
     setup_log_file()
-    app.controllers = dict()
-    app.switches = dict()
-    app.hosts = dict()
-    app.nats = dict()
-    app.routers = dict()
-    app.links = dict()
-    app.link_attrs = dict()
-    app.terminals = dict()
+    app.loop = asyncio.get_running_loop()
+    LOG_BUS.bind(app.loop)
+    app.registry = NodeRegistry()
+    for kind in NODE_KINDS:
+        setattr(app, kind, app.registry.collection(kind))
+    app.link_store = LinkStore()
+    app.links = app.link_store.links
+    app.link_attrs = app.link_store.attrs
+    app.reachability = ReachabilityCache(app.link_store.neighbors, forwards_traffic)
+    app.addressing = AddressingPlanCache()
+    app.route_tables = dict()
+    app.route_planner = Replanner(replan_static_routes, "route-planner")
+    app.route_planner.start()
+    app.proactive_flows = dict()
+    app.flow_planner = Replanner(replan_proactive_flows, "flow-planner")
+    app.flow_planner.start()
+    app.terminals = TerminalManager(open_node_shell)
+    app.ryu_apps = RyuAppCatalog(RYU_APP_DIRS)
+    app.ports = PortAllocator()
+    app.connections = SwitchConnectionTracker(on_change=publish_switch_connection)
+    app.connections.start()
+    app.ryu_apps.start()
     app.sniffers = dict()
     app.sniffer_manager = SnifferManager(list_mininet_interfaces, start_sniffer_process)
+    app.executor = NodeExecutor(interrupt=interrupt_node)
     app.pingall_running = False
     app.iperf_running = False
+    app.traffic = TrafficManager()
     setLogLevel("debug")
     app.net = Mininet(autoSetMacs=True, topo=Topo())
     app.net.is_started = False
+    app.store = TopologyStore(TOPOLOGY_DB)
+    app.store.open()
+    restore_topology(app.store.load())
+    app.events = TopologyEvents()
+    app.events.bind(asyncio.get_running_loop())
     yield
     # stop
+    app.store.close()
+    app.ryu_apps.stop()
+    app.connections.stop()
+    # A replan in flight waits on this loop, so join the planners off it.
+    await asyncio.to_thread(app.route_planner.stop)
+    await asyncio.to_thread(app.flow_planner.stop)
+    app.executor.shutdown()
     mn_cleanup()
+    LOG_PIPELINE.stop()
 
 from mininet_gui_backend import __version__ as BACKEND_VERSION
 try:
@@ -195,87 +303,138 @@ def get_health():
 
 @app.get("/api/ryu/apps")
 def get_ryu_apps():
-    return {"apps": list_ryu_apps()}
+    return {"apps": app.ryu_apps.apps()}
+
+@app.post("/api/ryu/apps/refresh")
+def refresh_ryu_apps():
+    return {"apps": app.ryu_apps.refresh(force=True)}
 
 
 def debug(msg, *args):
-    _debug(str(msg)+" "+" ".join(map(str, args))+"\n")
-
-def list_ryu_apps():
-    apps = set()
-    app_dirs = []
-    env_dirs = os.environ.get("RYU_APP_DIRS", "")
-    if env_dirs:
-        for entry in env_dirs.split(os.pathsep):
-            entry = entry.strip()
-            if entry:
-                app_dirs.append(entry)
-    for app_dir in RYU_APP_DIRS:
-        if os.path.isdir(app_dir):
-            app_dirs.append(app_dir)
+    if LOG_PIPELINE.enabled_for(logging.DEBUG):
+        logger.debug(LazyMessage(msg, args))
+
+
+def save_node(kind: str, node: BaseModel, op: str = "update"):
+    """Persist a node model and publish the change on the event feed."""
+    app.store.save_node(kind, node)
+    app.registry.touch()
+    app.events.publish(kind, op, node.name, node.model_dump())
+    if kind == "controllers":
+        app.reachability.mark_all()
+    else:
+        app.reachability.mark(node.name)
+    if kind == "switches":
+        app.connections.wake()
+    if kind in ("hosts", "routers"):
+        app.route_planner.mark()
+    if kind != "controllers":
+        app.flow_planner.mark()
+
+
+def forwards_traffic(node_id: str) -> bool:
+    # Hosts only send and receive; anything else, or an unknown node, may
+    # carry traffic between others.
+    return app.registry.kind_of(node_id) != "hosts"
+
+
+def mark_link(key: frozenset):
+    # A host's link only carries that host's traffic.
+    hosts = [node_id for node_id in key if not forwards_traffic(node_id)]
+    app.reachability.mark(*(hosts or key))
+
+
+def delete_node_record(kind: str, node_id: str):
+    app.store.delete_node(node_id)
+    app.events.publish(kind, "delete", node_id)
+    app.reachability.forget(node_id)
+    app.route_tables.pop(node_id, None)
+    app.executor.forget(node_id)
+    if kind == "switches":
+        app.connections.wake()
+    if kind == "controllers":
+        app.ports.release(node_id)
+
+
+def save_link(key: frozenset, op: str = "update"):
+    edge = app.link_store.edge(key)
+    src, dst = (edge["from"], edge["to"]) if edge else sorted(key)
+    app.store.save_link(src, dst, app.link_attrs.get(key))
+    app.events.publish("links", op, "|".join(sorted(key)), edge)
+    mark_link(key)
+    app.route_planner.mark()
+    app.flow_planner.mark()
+
+
+def delete_link_record(key: frozenset):
+    app.store.delete_link(*key)
+    app.events.publish("links", "delete", "|".join(sorted(key)))
+    mark_link(key)
+    app.route_planner.mark()
+    app.flow_planner.mark()
+
+
+def flows_changed(switch_id: str, op: str):
+    app.events.publish("flows", op, switch_id)
+    app.reachability.mark(switch_id)
+
+
+def interrupt_node(node_id: str):
+    node = app.net.nameToNode.get(node_id)
+    if node is not None and getattr(node, "shell", None) is not None:
+        node.sendInt()
+
+
+def node_command(nodes, fn, *args, timeout: Optional[float] = None, label: Optional[str] = None):
+    """Run ``fn`` in the executor queue of ``nodes``, which may be one name or several."""
     try:
-        import importlib
-        app_pkg = importlib.import_module("ryu.app")
-        if app_pkg and hasattr(app_pkg, "__path__"):
-            for _finder, name, _ispkg in pkgutil.iter_modules(app_pkg.__path__):
-                if name and not name.startswith("__"):
-                    apps.add(name)
-            pkg_dir = os.path.dirname(app_pkg.__file__)
-            if os.path.isdir(pkg_dir):
-                app_dirs.append(pkg_dir)
-    except Exception:
-        pass
+        return app.executor.run(nodes, fn, *args, timeout=timeout, label=label)
+    except TimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
 
+
+async def async_node_command(nodes, fn, *args, timeout: Optional[float] = None, label: Optional[str] = None):
     try:
-        result = subprocess.run(
-            ["ryu-manager", "--app-list"],
-            check=False,
-            capture_output=True,
-            text=True,
-            timeout=3,
-        )
-        if result.stdout:
-            for line in result.stdout.splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                token = line.split()[0]
-                if token.startswith("ryu.app."):
-                    apps.add(token[len("ryu.app."):])
-    except Exception:
-        pass
+        return await app.executor.run_async(nodes, fn, *args, timeout=timeout, label=label)
+    except TimeoutError as exc:
+        raise HTTPException(status_code=504, detail=str(exc))
+
+
+def publish_switch_connection(switch_id: str, status: dict):
+    app.events.publish("connections", "update", switch_id, status)
 
-    for app_dir in app_dirs:
-        try:
-            entries = os.listdir(app_dir)
-        except OSError:
-            continue
-        for entry in entries:
-            if entry.endswith(".py") and entry != "__init__.py":
-                apps.add(entry[:-3])
 
-    return sorted(apps)
+def publish_network_state(op: str = "update"):
+    app.reachability.clear()
+    # Namespaces are recreated on start/stop, so nothing applied survives.
+    app.route_tables.clear()
+    app.proactive_flows.clear()
+    app.route_planner.mark()
+    app.flow_planner.mark()
+    app.events.publish("network", op, data={"started": bool(getattr(app.net, "is_started", False))})
 
 def setup_log_file():
     os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    handler = logging.FileHandler(LOG_FILE)
-    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.DEBUG)
-    if not any(isinstance(h, logging.FileHandler) and getattr(h, "baseFilename", None) == handler.baseFilename for h in root_logger.handlers):
-        root_logger.addHandler(handler)
+    handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS
+    )
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    LOG_BUS.setFormatter(logging.Formatter(LOG_FORMAT))
+    loggers = [logging.getLogger()]
     try:
         from mininet.log import lg
-        lg.setLevel(logging.DEBUG)
-        if not any(isinstance(h, logging.FileHandler) and getattr(h, "baseFilename", None) == handler.baseFilename for h in lg.handlers):
-            lg.addHandler(handler)
+        loggers.append(lg)
     except Exception:
         pass
+    for target in loggers:
+        target.setLevel(logging.DEBUG)
+    LOG_PIPELINE.start(loggers, [handler, LOG_BUS])
 
 def clear_log_file():
     os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
     with open(LOG_FILE, "w", encoding="utf-8"):
         pass
+    LOG_BUS.clear()
 
 
 def add_host_to_net(host: Host):
@@ -330,7 +489,7 @@ def add_controller_to_net(controller: Controller, start=True):
         if not controller.ryu_app:
             raise HTTPException(status_code=400, detail="Ryu controller requires an app")
         ryu_apps = controller.ryu_app if isinstance(controller.ryu_app, list) else [controller.ryu_app]
-        available_apps = list_ryu_apps()
+        available_apps = app.ryu_apps.apps()
         if available_apps and any(app_name not in available_apps for app_name in ryu_apps):
             try:
                 import importlib
@@ -359,8 +518,10 @@ def add_controller_to_net(controller: Controller, start=True):
             controller.name, controller=NOX
         )
     else:
-        if not controller.port or controller.port in _list_listening_ports():
-            controller.port = _find_free_controller_port()
+        port = app.ports.allocate(controller.name, controller.port)
+        if port is None:
+            raise HTTPException(status_code=400, detail="no available controller ports")
+        controller.port = port
         controller_node = app.net.addController(
             controller.name, controller=ReferenceController, port=controller.port
         )
@@ -373,45 +534,6 @@ def add_controller_to_net(controller: Controller, start=True):
     return controller_node
 
 
-def _list_listening_ports() -> Set[int]:
-    result = subprocess.run(
-        ["netstat", "-tuln"],
-        text=True,
-        capture_output=True,
-    )
-    if result.returncode != 0:
-        detail = (result.stderr or result.stdout or "netstat failed").strip()
-        raise HTTPException(status_code=500, detail=detail)
-    ports: Set[int] = set()
-    for line in (result.stdout or "").splitlines():
-        line = line.strip()
-        if not line or line.lower().startswith("proto"):
-            continue
-        parts = line.split()
-        if len(parts) < 4:
-            continue
-        local = parts[3]
-        if ":" not in local:
-            continue
-        port_str = local.rsplit(":", 1)[-1]
-        if port_str.isdigit():
-            ports.add(int(port_str))
-    return ports
-
-
-def _find_free_controller_port() -> int:
-    used = _list_listening_ports()
-    ranges = [
-        range(6633, 6638),
-        range(6653, 6658),
-    ]
-    for rng in ranges:
-        for port in rng:
-            if port not in used:
-                return port
-    raise HTTPException(status_code=400, detail="no available controller ports")
-
-
 def add_switch_to_net(switch: Switch, start=True):
     switch_type = (switch.switch_type or "").lower()
     switch.switch_type = switch_type or switch.switch_type
@@ -467,22 +589,7 @@ def _apply_switch_openflow_version(switch_id: str, of_version: Optional[str], sw
 
 
 def _terminate_all_terminals():
-    for node_id, sessions in list(app.terminals.items()):
-        for session_id, (master_fd, process) in list(sessions.items()):
-            try:
-                process.terminate()
-            except Exception:
-                pass
-            try:
-                process.wait(timeout=0.1)
-            except Exception:
-                pass
-            try:
-                os.close(master_fd)
-            except Exception:
-                pass
-        sessions.clear()
-        app.terminals.pop(node_id, None)
+    app.terminals.kill_all()
 
 
 async def _stop_all_sniffers_quietly():
@@ -513,21 +620,24 @@ def list_mininet_interfaces():
     nodes = []
     if hasattr(app.net, "hosts"):
         for host in app.net.hosts:
-            intfs = [i.name for i in host.intfList() if i.name and i.name not in ("lo", "lo0")]
+            intfs = list(app.registry.interfaces(host))
             node_type = getattr(host, "type", "host")
             nodes.append({"id": host.name, "type": node_type, "intfs": intfs, "pid": host.pid})
     if hasattr(app.net, "switches"):
         for sw in app.net.switches:
-            intfs = [i.name for i in sw.intfList() if i.name and i.name not in ("lo", "lo0")]
+            intfs = list(app.registry.interfaces(sw))
             node_type = getattr(sw, "type", "switch")
             nodes.append({"id": sw.name, "type": node_type, "intfs": intfs, "pid": sw.pid})
     return nodes
 
+def topology_revision():
+    return (id(app.net), app.net.is_started, app.registry.revision, app.link_store.revision)
+
 @app.get("/api/mininet/addressing_plan")
-def addressing_plan():
+def addressing_plan(refresh: bool = False):
     if not app.net.is_started:
         raise HTTPException(status_code=400, detail="network must be started")
-    return build_addressing_plan(app.net)
+    return app.addressing.get(app.net, topology_revision(), refresh=refresh)
 
 @app.get("/api/mininet/hosts")
 def list_hosts():
@@ -566,37 +676,101 @@ def list_routers():
     return app.routers
 
 @app.get("/api/mininet/links")
-def list_edges():
-    edges = []
-    for key in app.links:
-        nodes = list(key)
-        attrs = app.link_attrs.get(key) or {}
-        link = app.links.get(key)
-        from_node = nodes[0] if len(nodes) > 0 else None
-        to_node = nodes[1] if len(nodes) > 1 else None
-        intfs = None
-        intf1 = getattr(link, "intf1", None)
-        intf2 = getattr(link, "intf2", None)
-        if intf1 and intf2 and getattr(intf1, "node", None) and getattr(intf2, "node", None):
-            from_node = intf1.node.name
-            to_node = intf2.node.name
-            intfs = {"from": intf1.name, "to": intf2.name}
-        if from_node and to_node:
-            edges.append({"from": from_node, "to": to_node, "options": attrs, "intfs": intfs})
-    return edges
+def list_edges(if_none_match: Optional[str] = Header(None)):
+    etag = app.link_store.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=app.link_store.edges_json(), media_type="application/json", headers=headers)
+
+
+@app.get("/api/mininet/links/{node_id}")
+def list_node_edges(node_id: str):
+    if node_id not in app.registry:
+        raise HTTPException(status_code=404, detail=f"Node {node_id} not found")
+    edges = [app.link_store.edge(key) for key in app.link_store.node_links(node_id)]
+    return {
+        "node": node_id,
+        "neighbors": sorted(app.link_store.neighbors(node_id)),
+        "edges": [edge for edge in edges if edge is not None],
+    }
+
+def build_snapshot() -> dict:
+    # Read the revision first: events published while collecting are
+    # delivered again and clients skip them by revision.
+    revision = app.events.revision
+    snapshot = {"epoch": app.events.epoch, "rev": revision, "started": bool(app.net.is_started)}
+    for kind in NODE_KINDS:
+        snapshot[kind] = {node_id: node.model_dump() for node_id, node in getattr(app, kind).items()}
+    snapshot["links"] = app.link_store.edges()
+    return snapshot
+
+
+def snapshot_event() -> dict:
+    snapshot = build_snapshot()
+    return {"epoch": snapshot["epoch"], "rev": snapshot["rev"], "kind": "snapshot", "op": "snapshot", "id": None, "data": snapshot}
+
+
+@app.get("/api/mininet/snapshot")
+def get_snapshot():
+    return build_snapshot()
+
+
+@app.websocket("/api/mininet/events")
+async def websocket_events(websocket: WebSocket):
+    """Streams topology deltas; pass ?epoch=<epoch>&since=<rev> to resume without a snapshot."""
+    await websocket.accept()
+    queue = app.events.subscribe()
+    try:
+        backlog = None
+        last_rev = 0
+        since = websocket.query_params.get("since")
+        if since is not None:
+            try:
+                last_rev = int(since)
+                backlog = app.events.since(last_rev, websocket.query_params.get("epoch"))
+            except ValueError:
+                backlog = None
+        if backlog is None:
+            backlog = [snapshot_event()]
+        for event in backlog:
+            await websocket.send_json(event)
+            last_rev = event["rev"]
+        while True:
+            event = await queue.get()
+            if event["kind"] == "resync":
+                event = snapshot_event()
+            elif event["rev"] <= last_rev:
+                continue
+            last_rev = event["rev"]
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        app.events.unsubscribe(queue)
+
 
 @app.get("/api/mininet/start")
 def get_network_started():
     return app.net.is_started
 
-@app.post("/api/mininet/start")
-def start_network():
-    """Build network and start nodes"""
-    if app.net.is_started:
-        raise HTTPException(status_code=400, detail="network already started")
+def start_controllers():
     app.net.build()
     for controller in app.controllers:
         app.net.nameToNode[controller].start()
+
+
+async def wait_for_controllers():
+    """Wait until every Ryu controller listens, all of them at once."""
+    ryus = [app.net.nameToNode[controller] for controller in app.controllers]
+    ryus = [node for node in ryus if isinstance(node, Ryu)]
+    ready = await asyncio.gather(*(node.waitReady() for node in ryus))
+    for node, listening in zip(ryus, ready):
+        if not listening:
+            debug("ryu controller did not start listening in time", node.name, node.port)
+
+
+def start_switches():
     for switch_id in app.switches:
         switch = app.net.nameToNode[switch_id]
         controller_id = getattr(app.switches[switch_id], "controller", None)
@@ -609,14 +783,43 @@ def start_network():
         else:
             switch.controller = None
             switch.start([])
+
+
+@app.post("/api/mininet/start")
+async def start_network(wait: bool = False, timeout: float = CONVERGENCE_TIMEOUT):
+    """Build network and start nodes; with wait, block until switches reach their controllers"""
+    if app.net.is_started:
+        raise HTTPException(status_code=400, detail="network already started")
+    await asyncio.to_thread(start_controllers)
+    # Ryu takes a moment to bind its OpenFlow port; switches started before
+    # that fall into backoff and take seconds to connect.
+    await wait_for_controllers()
+    await asyncio.to_thread(start_switches)
     app.net.is_started = True
+    app.connections.activate(lambda: expected_switches(list(app.net.switches)))
+    publish_network_state()
+    if wait:
+        converged = await asyncio.to_thread(app.connections.wait, timeout)
+        return {"status": "ok", "converged": converged, "convergence": app.connections.state()}
     return {"status": "ok"}
 
+@app.get("/api/mininet/convergence")
+def get_convergence():
+    return app.connections.state()
+
+@app.post("/api/mininet/convergence/wait")
+def wait_for_convergence(timeout: float = CONVERGENCE_TIMEOUT):
+    if not app.net.is_started:
+        raise HTTPException(status_code=400, detail="network must be started to wait for convergence")
+    return {"converged": app.connections.wait(timeout), "convergence": app.connections.state()}
+
 @app.post("/api/mininet/stop")
 async def stop_network():
     """Stop network and nodes"""
     await _stop_all_sniffers_quietly()
     _terminate_all_terminals()
+    app.traffic.cancel_all()
+    app.connections.deactivate()
     app.iperf_running = False
 
     await _stop_mininet_with_timeout()
@@ -628,8 +831,15 @@ async def stop_network():
     setLogLevel("debug")
     app.net = Mininet(autoSetMacs=True, topo=Topo())
     app.net.is_started = False
-    app.links = dict()
-    # Recreate topology without start
+    rebuild_topology()
+    publish_network_state()
+    return {"status": "ok"}
+
+
+def rebuild_topology():
+    """Recreate the app.* topology in app.net without starting it."""
+    app.link_store.detach()
+    app.registry.invalidate_interfaces()
     entries = [
         (add_host_to_net, app.hosts.values(), {}),
         (add_router_to_net, app.routers.values(), {}),
@@ -640,7 +850,6 @@ async def stop_network():
     for builder, collection, kwargs in entries:
         for item in collection:
             builder(item, **kwargs)
-    app.links = dict()
     for key, attrs in list(app.link_attrs.items()):
         nodes = list(key)
         if len(nodes) != 2:
@@ -658,11 +867,36 @@ async def stop_network():
                     node.configDefault()
                 elif node.type == "sw" and node.controller:
                     node.start([node.controller])
-        app.links[key] = new_link
-    return {"status": "ok"}
+        app.link_store.set_link(key, new_link)
+
+
+def restore_topology(data: dict):
+    """Load a topology saved by app.store into app.* and app.net."""
+    models = [
+        ("controllers", Controller),
+        ("switches", Switch),
+        ("hosts", Host),
+        ("routers", Router),
+        ("nats", Nat),
+    ]
+    for kind, model in models:
+        for item in data.get(kind, []):
+            try:
+                node = model(**item)
+            except Exception as exc:
+                debug("skipping invalid stored node", item, exc)
+                continue
+            app.registry.add(kind, node)
+    for src, dst, options in data.get("links", []):
+        if src in app.registry and dst in app.registry:
+            app.link_store.add(src, dst, None, options)
+    try:
+        rebuild_topology()
+    except Exception as exc:
+        debug("failed to restore stored topology", exc)
 
 @app.post("/api/mininet/reset")
-async def reset_network():
+async def reset_network(wait: bool = False, timeout: float = CONVERGENCE_TIMEOUT):
     """Restart network and nodes"""
     try:
         await app.sniffer_manager.stop()
@@ -670,7 +904,11 @@ async def reset_network():
         pass
     clear_log_file()
     await stop_network()
-    return start_network()
+    result = await start_network()
+    if wait:
+        converged = await asyncio.to_thread(app.connections.wait, timeout)
+        result.update(converged=converged, convergence=app.connections.state())
+    return result
 
 @app.post("/api/mininet/full_reset")
 async def full_reset_network():
@@ -682,52 +920,149 @@ async def full_reset_network():
     await _stop_mininet_with_timeout()
     mn_cleanup()
 
-    app.controllers = dict()
-    app.switches = dict()
-    app.hosts = dict()
-    app.nats = dict()
-    app.routers = dict()
-    app.links = dict()
-    app.link_attrs = dict()
-    app.terminals = dict()
+    app.registry.clear()
+    app.link_store.clear()
+    app.ports.clear()
+    app.route_tables = dict()
     app.sniffers = dict()
     app.pingall_running = False
+    app.traffic.cancel_all()
+    app.connections.deactivate()
     app.iperf_running = False
+    app.store.clear()
 
     setLogLevel("debug")
     app.net = Mininet(autoSetMacs=True, topo=Topo())
     app.net.is_started = False
+    publish_network_state("reset")
     return {"status": "ok"}
 
+def ping_hosts():
+    return [(host.name, host.pid, host.IP()) for host in app.net.hosts]
+
 @app.post("/api/mininet/pingall")
-def run_pingall():
-    """Build network and start nodes"""
+async def run_pingall(request: Optional[PingallRequest] = None):
+    """Ping every host pair, probing from all sources concurrently"""
+    request = request or PingallRequest()
     if not app.net.is_started:
         raise HTTPException(status_code=400, detail="network must be started to run pingall")
     if app.pingall_running:
         raise HTTPException(status_code=409, detail="pingall already running")
     app.pingall_running = True
     try:
-        pingall_results = app.net.pingFull()
-        debug(pingall_results)
-        return "\n".join(
-            [
-                f"{p[0]}->{p[1]}: {p[2][0]}/{p[2][1]}, rtt min/avg/max/mdev {p[2][2]:.3f}/{p[2][3]:.3f}/{p[2][4]:.3f}/{p[2][5]:.3f} ms"
-                for p in pingall_results
-            ]
-        )
+        hosts = ping_hosts()
+        # A full sweep covers every change recorded so far.
+        app.reachability.plan([name for name, _, _ in hosts], full=True)
+        try:
+            sweep = PingSweep(hosts, count=request.count, timeout=request.timeout, concurrency=request.concurrency)
+            results = await sweep.run()
+        except BaseException:
+            app.reachability.mark_all()
+            raise
+        app.reachability.store(results, complete=True)
+        debug("pingall finished in", f"{sweep.elapsed:.2f}s", len(results), "pairs")
+        if request.matrix:
+            return sweep.matrix()
+        return format_ping_text(results)
+    finally:
+        app.pingall_running = False
+
+@app.websocket("/api/mininet/pingall")
+async def websocket_pingall(websocket: WebSocket):
+    """Streams pingall results per pair, then the loss/RTT matrix"""
+    await websocket.accept()
+    if not app.net.is_started or app.pingall_running:
+        detail = "pingall already running" if app.net.is_started else "network must be started to run pingall"
+        await websocket.send_json({"type": "error", "detail": detail})
+        await websocket.close()
+        return
+    params = websocket.query_params
+    try:
+        count = int(params.get("count", PING_COUNT))
+        timeout = float(params.get("timeout", PING_TIMEOUT_SECONDS))
+        concurrency = int(params.get("concurrency", PING_CONCURRENCY))
+    except ValueError:
+        await websocket.send_json({"type": "error", "detail": "invalid count, timeout or concurrency"})
+        await websocket.close()
+        return
+    app.pingall_running = True
+    planned = completed = False
+    try:
+        hosts = ping_hosts()
+        app.reachability.plan([name for name, _, _ in hosts], full=True)
+        planned = True
+        sweep = PingSweep(hosts, count=count, timeout=timeout, concurrency=concurrency)
+        await websocket.send_json({"type": "start", "pairs": len(sweep.pairs), "fping": sweep.use_fping})
+
+        async def send_result(result: dict):
+            await websocket.send_json({"type": "result", **result})
+
+        await sweep.run(send_result)
+        app.reachability.store(sweep.results, complete=True)
+        completed = True
+        await websocket.send_json({"type": "done", **sweep.matrix()})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as exc:
+        debug(f"Pingall WebSocket error: {exc}")
+    finally:
+        if planned and not completed:
+            app.reachability.mark_all()
+        app.pingall_running = False
+
+@app.get("/api/mininet/reachability")
+def get_reachability():
+    """Cached pair results, without probing"""
+    names = [host.name for host in app.net.hosts]
+    results = app.reachability.results(names)
+    checked = [result["checked_at"] for result in results]
+    return {
+        **ping_matrix(names, results),
+        "pending": app.reachability.pending(),
+        "oldest_check": min(checked) if checked else None,
+        "newest_check": max(checked) if checked else None,
+    }
+
+@app.post("/api/mininet/reachability")
+async def refresh_reachability(request: Optional[PingallRequest] = None, full: bool = False):
+    """Re-probe only the pairs affected by changes since the last check"""
+    request = request or PingallRequest()
+    if not app.net.is_started:
+        raise HTTPException(status_code=400, detail="network must be started to check reachability")
+    if app.pingall_running:
+        raise HTTPException(status_code=409, detail="pingall already running")
+    app.pingall_running = True
+    try:
+        hosts = ping_hosts()
+        names = [name for name, _, _ in hosts]
+        pairs, seeds = app.reachability.plan(names, full=full)
+        try:
+            sweep = PingSweep(hosts, count=request.count, timeout=request.timeout, concurrency=request.concurrency, pairs=pairs)
+            await sweep.run()
+        except BaseException:
+            app.reachability.restore(seeds)
+            raise
     finally:
         app.pingall_running = False
+    app.reachability.store(sweep.results, complete=seeds is None)
+    return {
+        **ping_matrix(names, app.reachability.results(names), sweep.elapsed),
+        "probed": len(sweep.results),
+        "full": seeds is None,
+    }
 
 @app.post("/api/mininet/hosts")
 def create_host(host: Host):
     if host.id in app.hosts:
-        app.hosts[host.id] = host
+        app.registry.add("hosts", host)
+        save_node("hosts", host)
         return {"status": "updated"}
     # Create host in the Mininet network using the request data
     debug(host)
     new_host = add_host_to_net(host)
-    app.hosts[host.name] = host
+    app.registry.add("hosts", host)
+    save_node("hosts", host, op="add")
     debug(new_host)
     # Return an OK status code
     return {"status": "ok"}
@@ -735,11 +1070,13 @@ def create_host(host: Host):
 @app.post("/api/mininet/routers")
 def create_router(router: Router):
     if router.id in app.routers:
-        app.routers[router.id] = router
+        app.registry.add("routers", router)
+        save_node("routers", router)
         return {"status": "updated"}
     debug(router)
     new_router = add_router_to_net(router)
-    app.routers[router.name] = router
+    app.registry.add("routers", router)
+    save_node("routers", router, op="add")
     debug(new_router)
     return {"status": "ok"}
 
@@ -771,39 +1108,36 @@ def update_host(host_id: str, payload: HostUpdate):
             else:
                 prefix_len = 8
         intf = payload.intf or None
-        node.setIP(addr, prefixLen=prefix_len, intf=intf)
+        node_command(host_id, lambda: node.setIP(addr, prefixLen=prefix_len, intf=intf), label="set_ip")
         host.ip = f"{addr}/{prefix_len}"
+    route = None
     if payload.default_route_type:
         route_type = payload.default_route_type.strip().lower()
         if route_type == "dev":
-            dev = (payload.default_route_dev or "").strip()
-            if dev:
-                node.setDefaultRoute(dev)
-            else:
-                node.cmd("ip route del default")
+            route = (payload.default_route_dev or "").strip()
         elif route_type == "ip":
             ip_value = (payload.default_route_ip or "").strip()
-            if ip_value:
-                node.setDefaultRoute(f"via {ip_value}")
-            else:
-                node.cmd("ip route del default")
+            route = f"via {ip_value}" if ip_value else ""
     elif payload.default_route is not None:
-        route_value = payload.default_route.strip()
-        if route_value:
-            node.setDefaultRoute(route_value)
+        route = payload.default_route.strip()
+    if route is not None:
+        if route:
+            node_command(host_id, node.setDefaultRoute, route, label="set_default_route")
         else:
-            node.cmd("ip route del default")
-    app.hosts[host_id] = host
+            node_command(host_id, node.cmd, "ip route del default", label="del_default_route")
+    save_node("hosts", host)
     return {"status": "ok", "host": host.model_dump()}
 
 @app.post("/api/mininet/nats")
 def create_nat(nat: Nat):
     if nat.id in app.nats:
-        app.nats[nat.id] = nat
+        app.registry.add("nats", nat)
+        save_node("nats", nat)
         return {"status": "updated"}
     debug(nat)
     new_nat = add_nat_to_net(nat)
-    app.nats[nat.name] = nat
+    app.registry.add("nats", nat)
+    save_node("nats", nat, op="add")
     debug(new_nat)
     return {"status": "ok"}
 
@@ -817,7 +1151,8 @@ def create_switch(switch: Switch):
             status_code=400, detail=f'controller "{switch.controller}" does not exist'
         )
     new_switch = add_switch_to_net(switch)
-    app.switches[switch.name] = switch
+    app.registry.add("switches", switch)
+    save_node("switches", switch, op="add")
     return switch
 
 
@@ -826,7 +1161,8 @@ def create_controller(controller: Controller):
     # Create controller in the Mininet network using the request data
     debug(controller)
     new_controller = add_controller_to_net(controller, start=True)
-    app.controllers[controller.name] = controller
+    app.registry.add("controllers", controller)
+    save_node("controllers", controller, op="add")
     debug(new_controller)
     return {"status": "ok"}
 
@@ -839,7 +1175,7 @@ def update_controller(controller_id: str, payload: ControllerUpdate):
     updates = payload.model_dump(exclude_none=True)
     for key, value in updates.items():
         setattr(controller, key, value)
-    app.controllers[controller_id] = controller
+    save_node("controllers", controller)
     return {"controller": controller.model_dump()}
 
 
@@ -855,6 +1191,7 @@ def update_switch_openflow_version(switch_id: str, payload: SwitchUpdate):
         raise HTTPException(status_code=400, detail="invalid OpenFlow version")
     _apply_switch_openflow_version(switch_id, of_version)
     app.switches[switch_id].of_version = of_version
+    save_node("switches", app.switches[switch_id])
     return {"switch": app.switches[switch_id].model_dump()}
 
 @app.post("/api/mininet/associate_switch")
@@ -874,10 +1211,32 @@ def associate_switch(data: dict):
         raise HTTPException(status_code=400, detail="switch is already associated")
     sw.controller = ctl
     app.switches[sw_id].controller = ctl_id
+    save_node("switches", app.switches[sw_id])
     if app.net.is_started:
-        sw.start([sw.controller])
+        node_command(sw_id, sw.start, [sw.controller], label="start_switch")
     return "OK"
 
+def attach_link(src: str, dst: str, link_kwargs: dict):
+    new_link = app.net.addLink(src, dst, **link_kwargs)
+    if app.net.is_started:
+        for node in (src, dst):
+            node = app.net.nameToNode[node]
+            if node.type in ("host", "nat", "router"):
+                node.configDefault()
+            elif node.type == "sw" and node.controller:
+                # Important, otherwise switch doesnt init the port
+                controller_node = (
+                    node.controller
+                    if not isinstance(node.controller, str)
+                    else app.net.nameToNode.get(node.controller)
+                )
+                if controller_node:
+                    node.controller = controller_node
+                    node.start([controller_node])
+                else:
+                    node.start([])
+    return new_link
+
 @app.post("/api/mininet/links")
 def create_link(payload: Union[Tuple[str, str], LinkCreate]):
     if isinstance(payload, (list, tuple)):
@@ -889,12 +1248,11 @@ def create_link(payload: Union[Tuple[str, str], LinkCreate]):
 
     if src not in app.net.nameToNode or dst not in app.net.nameToNode:
         raise HTTPException(status_code=400, detail=f'node not in net')
-    if app.net.nameToNode[src].type == "host" and app.net.nameToNode[src].intfList() and len([i for i in app.net.nameToNode[src].intfList() if i.name and i.name not in ("lo", "lo0")]) >= 1:
-        raise HTTPException(status_code=400, detail="host already has a link")
-    if app.net.nameToNode[dst].type == "host" and app.net.nameToNode[dst].intfList() and len([i for i in app.net.nameToNode[dst].intfList() if i.name and i.name not in ("lo", "lo0")]) >= 1:
-        raise HTTPException(status_code=400, detail="host already has a link")
-    key = frozenset((src, dst))
-    if key in app.links:
+    for node_id in (src, dst):
+        if app.registry.kind_of(node_id) == "hosts" and app.registry.interfaces(app.net.nameToNode[node_id]):
+            raise HTTPException(status_code=400, detail="host already has a link")
+    key = link_key(src, dst)
+    if key in app.link_store:
         raise HTTPException(status_code=400, detail=f'link already exists')
     link_kwargs = {}
     if options:
@@ -905,45 +1263,31 @@ def create_link(payload: Union[Tuple[str, str], LinkCreate]):
             opt["jitter"] = f"{opt['jitter']}ms"
         link_kwargs.update(opt)
         link_kwargs["cls"] = TCLink
-    new_link = app.net.addLink(src, dst, **link_kwargs)
-    if app.net.is_started:
-        for node in (src, dst):
-            node = app.net.nameToNode[node]
-            if node.type in ("host", "nat", "router"):
-                node.configDefault()
-            elif node.type == "sw" and node.controller:
-                # Important, otherwise switch doesnt init the port
-                controller_node = (
-                    node.controller
-                    if not isinstance(node.controller, str)
-                    else app.net.nameToNode.get(node.controller)
-                )
-                if controller_node:
-                    node.controller = controller_node
-                    node.start([controller_node])
-                else:
-                    node.start([])
+    new_link = node_command((src, dst), attach_link, src, dst, link_kwargs, label="create_link")
     # It is important to store this Link object because
     # mininet (apparently) doesn't have an easy way to access this
-    app.links[key] = new_link
-    if options:
-        app.link_attrs[key] = options.model_dump(exclude_none=True)
-    else:
-        app.link_attrs[key] = {}
+    app.link_store.add(src, dst, new_link, options.model_dump(exclude_none=True) if options else {})
+    app.registry.invalidate_interfaces(src, dst)
+    save_link(key, op="add")
     intfs = None
     if getattr(new_link, "intf1", None) and getattr(new_link, "intf2", None):
         intfs = {"from": new_link.intf1.name, "to": new_link.intf2.name}
     return {"from": src, "to": dst, "options": app.link_attrs[key], "intfs": intfs}
 
 
+def configure_link(link, config_opts: dict):
+    link.intf1.config(**config_opts)
+    link.intf2.config(**config_opts)
+
+
 @app.put("/api/mininet/links")
 def update_link(payload: LinkUpdate):
     src, dst = payload.src, payload.dst
     options = payload.options
     if src not in app.net.nameToNode or dst not in app.net.nameToNode:
         raise HTTPException(status_code=400, detail="node not in net")
-    key = frozenset((src, dst))
-    if key not in app.links:
+    key = link_key(src, dst)
+    if key not in app.link_store:
         raise HTTPException(status_code=404, detail="link not found")
     stored_opts = options.model_dump(exclude_none=True) if options else {}
     config_opts = dict(stored_opts)
@@ -951,13 +1295,13 @@ def update_link(payload: LinkUpdate):
         config_opts["delay"] = f"{config_opts['delay']}ms"
     if "jitter" in config_opts and isinstance(config_opts["jitter"], (int, float)):
         config_opts["jitter"] = f"{config_opts['jitter']}ms"
-    app.link_attrs[key] = stored_opts
+    app.link_store.set_attrs(key, stored_opts)
+    save_link(key)
 
     link = app.links.get(key)
     if link and config_opts:
         try:
-            link.intf1.config(**config_opts)
-            link.intf2.config(**config_opts)
+            node_command((src, dst), configure_link, link, config_opts, label="update_link")
         except Exception as exc:
             debug("failed to update link config", exc)
 
@@ -966,7 +1310,7 @@ def update_link(payload: LinkUpdate):
 
 @app.get("/api/mininet/links/stats/{src_id}/{dst_id}")
 def get_link_stats(src_id: str, dst_id: str):
-    key = frozenset((src_id, dst_id))
+    key = link_key(src_id, dst_id)
     link = app.links.get(key)
     if not link:
         raise HTTPException(status_code=404, detail="link not found")
@@ -989,72 +1333,156 @@ def get_link_stats(src_id: str, dst_id: str):
     }
 
 
+def apply_node_positions(positions: Dict[str, Tuple[float, float]]):
+    """Update node coordinates in one pass; returns the ids that were not found."""
+    missing = []
+    changed = {}
+    name_to_node = app.net.nameToNode
+    for node_id, (x, y) in positions.items():
+        node = name_to_node.get(node_id)
+        model = app.registry.get(node_id)
+        if node is None or model is None:
+            missing.append(node_id)
+            continue
+        kind = app.registry.kind_of(node_id)
+        node.x = model.x = x
+        node.y = model.y = y
+        changed.setdefault(kind, []).append(model)
+    for kind, models in changed.items():
+        app.store.save_nodes(kind, models)
+    if changed:
+        app.events.publish(
+            "positions",
+            "update",
+            data={node_id: positions[node_id] for node_id in positions if node_id not in missing},
+        )
+    return missing
+
+
 @app.post("/api/mininet/node_position")
 def node_position(data: dict):
     if "node_id" not in data or "position" not in data:
         raise HTTPException(
             status_code=400, detail=f'missing key in data'
         )
-    debug("data:",data)
     node_id = data["node_id"]
     x, y = data["position"]
-    if node_id not in app.net.nameToNode:
+    if apply_node_positions({node_id: (x, y)}):
         raise HTTPException(status_code=404, detail=f"Node {node_id} not found")
-    node = app.net.nameToNode[node_id]
-    debug("before update xy",(node.x, node.y))
-    node.x = x
-    node.y = y
-    debug("updated xy",(app.net.nameToNode[node_id].x, app.net.nameToNode[node_id].y))
-    if node.type == "sw":
-        app.switches[node_id].x = x
-        app.switches[node_id].y = y
-    elif node.type == "host":
-        app.hosts[node_id].x = x
-        app.hosts[node_id].y = y
-    elif node.type == "controller":
-        app.controllers[node_id].x = x
-        app.controllers[node_id].y = y
-    elif node.type == "nat":
-        app.nats[node_id].x = x
-        app.nats[node_id].y = y
-    elif node.type == "router":
-        app.routers[node_id].x = x
-        app.routers[node_id].y = y
     return {"message": f"Node {node_id} updated successfully"}
 
 
+@app.post("/api/mininet/node_positions")
+def node_positions(payload: NodePositionsUpdate):
+    """Update the positions of many nodes at once."""
+    missing = apply_node_positions(payload.positions)
+    return {"updated": len(payload.positions) - len(missing), "missing": missing}
+
+
+@app.websocket("/api/mininet/node_positions")
+async def websocket_node_positions(websocket: WebSocket):
+    """Accepts {node_id: [x, y], ...} messages, coalescing updates that queue up while one is applied."""
+    await websocket.accept()
+    pending: Dict[str, Tuple[float, float]] = {}
+    wakeup = asyncio.Event()
+
+    async def receive():
+        try:
+            while True:
+                try:
+                    message = await websocket.receive_json()
+                    positions = message.get("positions", message) if isinstance(message, dict) else None
+                    if not isinstance(positions, dict):
+                        raise ValueError("expected an object mapping node ids to [x, y]")
+                    parsed = {}
+                    for node_id, position in positions.items():
+                        if isinstance(position, (list, tuple)) and len(position) == 2:
+                            parsed[node_id] = (float(position[0]), float(position[1]))
+                except (ValueError, TypeError) as exc:
+                    # Bad frames are reported and skipped; the stream stays open.
+                    await websocket.send_json({"type": "error", "detail": str(exc)})
+                    continue
+                pending.update(parsed)
+                wakeup.set()
+        except WebSocketDisconnect:
+            pass
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while True:
+            waiter = asyncio.create_task(wakeup.wait())
+            await asyncio.wait({receiver, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            wakeup.clear()
+            if pending:
+                batch = dict(pending)
+                pending.clear()
+                apply_node_positions(batch)
+            if receiver.done():
+                break
+    finally:
+        receiver.cancel()
+
+
+def remove_node_from_net(node, links: list):
+    for link in links:
+        if link is not None:
+            try:
+                app.net.delLink(link)
+            except Exception as exc:
+                debug("failed to delete link", exc)
+    app.net.delNode(node)
+
+
 @app.delete("/api/mininet/delete_node/{node_id}")
 def delete_node(node_id: str):
     if node_id not in app.net.nameToNode:
         raise HTTPException(status_code=404, detail=f"Node {node_id} not found")
     node = app.net.nameToNode[node_id]
-    app.net.delNode(node)
-    if node.type == "sw":
-        del app.switches[node_id]
-    elif node.type == "host":
-        del app.hosts[node_id]
-    elif node.type == "controller":
-        del app.controllers[node_id]
+    neighbors = app.link_store.neighbors(node_id)
+    keys = app.link_store.node_links(node_id)
+    # Take the node out of the net first: if that fails or times out, its
+    # links and records are still all in place.
+    try:
+        node_command(
+            (node_id, *sorted(neighbors)), remove_node_from_net, node, [app.links.get(key) for key in keys],
+            label="delete_node",
+        )
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"failed to delete node {node_id}: {exc}")
+    for key in keys:
+        app.link_store.remove(key)
+        delete_link_record(key)
+    kind = app.registry.kind_of(node_id)
+    app.registry.remove(node_id)
+    if neighbors:
+        app.registry.invalidate_interfaces(*neighbors)
+    if kind == "controllers":
         for switch_id in app.switches:
             switch = app.switches[switch_id]
             if switch.controller == node_id:
                 debug("CONTROLLER", switch.controller, node_id)
                 app.switches[switch_id].controller = None
-                app.net.nameToNode[switch_id].start([])
-    elif node.type == "nat":
-        del app.nats[node_id]
-    elif node.type == "router":
-        del app.routers[node_id]
+                try:
+                    node_command(switch_id, app.net.nameToNode[switch_id].start, [], label="start_switch")
+                except Exception as exc:
+                    # The controller is gone already; finish removing its records.
+                    debug("failed to restart switch", switch_id, exc)
+                save_node("switches", switch)
+    delete_node_record(kind, node_id)
     return {"message": f"Node {node_id} deleted successfully"}
 
 @app.delete("/api/mininet/delete_link/{src_id}/{dst_id}")
 def delete_link(src_id: str, dst_id: str):
-    key = frozenset((src_id, dst_id))
+    key = link_key(src_id, dst_id)
     if key not in app.links:
         raise HTTPException(status_code=404, detail=f"Node not found")
-    app.net.delLink(app.links[key])
-    del app.links[key]
-    app.link_attrs.pop(key, None)
+    node_command((src_id, dst_id), app.net.delLink, app.links[key], label="delete_link")
+    app.link_store.remove(key)
+    app.registry.invalidate_interfaces(src_id, dst_id)
+    delete_link_record(key)
     return {"message": f"Link {key} deleted successfully"}
 
 @app.delete("/api/mininet/remove_association/{src_id}/{dst_id}")
@@ -1063,87 +1491,303 @@ def remove_association(src_id: str, dst_id: str):
         raise HTTPException(status_code=400, detail='node not in net')
     sw, ctl = None, None
     for node_id in (src_id, dst_id):
-        node = app.net.nameToNode[node_id]
-        if node.type == "sw":
-            sw = node
-        elif node.type == "controller":
-            ctl = node
+        kind = app.registry.kind_of(node_id)
+        if kind == "switches":
+            sw = app.net.nameToNode[node_id]
+        elif kind == "controllers":
+            ctl = app.net.nameToNode[node_id]
     if not sw or not ctl:
         raise HTTPException(status_code=400, detail=f'node {node_id} isnt switch or controller')
     sw.controller = None
     app.switches[sw.name].controller = None
+    save_node("switches", app.switches[sw.name])
     if app.net.is_started:
-        sw.start([])
+        node_command(sw.name, sw.start, [], label="start_switch")
     return "OK"
 
 
+def namespace_pid(node) -> Optional[int]:
+    return node.pid if getattr(node, "inNamespace", False) else None
+
+@app.get("/api/mininet/netstate")
+async def get_netstate(nodes: Optional[str] = None):
+    """Neighbours, routes and links of many hosts/routers, read in parallel"""
+    if not app.net.is_started:
+        raise HTTPException(status_code=400, detail="network must be started to read node state")
+    if nodes:
+        names = [name.strip() for name in nodes.split(",") if name.strip()]
+        missing = [name for name in names if name not in app.net.nameToNode]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Nodes not found: {', '.join(missing)}")
+    else:
+        names = [name for name, node in app.net.nameToNode.items() if getattr(node, "type", None) in ("host", "router")]
+    pids = {name: namespace_pid(app.net.nameToNode[name]) for name in names}
+    return await read_netstates(pids)
+
+def routed_node(node_id: str):
+    if node_id not in app.net.nameToNode:
+        raise HTTPException(status_code=404, detail=f"Node {node_id} not found")
+    node = app.net.nameToNode[node_id]
+    if getattr(node, "type", None) not in ("host", "router"):
+        raise HTTPException(status_code=400, detail=f"{node_id} is not a host or router")
+    return node
+
+def desired_routes(node_id: str, entries: List[RouteEntry]) -> list:
+    routes = []
+    seen = set()
+    for entry in entries:
+        try:
+            route = normalize_route(entry.model_dump())
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"{node_id}: {exc}")
+        key = (route["dst"], route["metric"])
+        if key in seen:
+            raise HTTPException(status_code=400, detail=f"{node_id}: duplicate route to {route['dst']}")
+        seen.add(key)
+        routes.append(route)
+    return routes
+
+async def apply_route_tables(tables: Dict[str, List[RouteEntry]], dry_run: bool) -> Dict[str, dict]:
+    if not app.net.is_started:
+        raise HTTPException(status_code=400, detail="network must be started to manage routes")
+    desired = {node_id: desired_routes(node_id, entries) for node_id, entries in tables.items()}
+    return await sync_desired_routes(desired, dry_run)
+
+async def sync_desired_routes(
+    desired: Dict[str, list], dry_run: bool = False, owner: Optional[str] = None
+) -> Dict[str, dict]:
+    targets = {node_id: (namespace_pid(routed_node(node_id)), routes) for node_id, routes in desired.items()}
+    results = await sync_route_tables(targets, dry_run=dry_run, owner=owner)
+    if not dry_run:
+        for node_id, result in results.items():
+            if result["status"] == "ok":
+                app.route_tables[node_id] = desired[node_id]
+            else:
+                # Partly applied or unreadable: forget the table so the next
+                # sync diffs this node again instead of trusting it.
+                app.route_tables.pop(node_id, None)
+            if result["add"] or result["remove"]:
+                app.events.publish("routes", "update", node_id, result)
+                app.reachability.mark(node_id)
+    return results
+
+async def apply_static_routes(apply: bool = True, full: bool = False) -> dict:
+    """Plan shortest-path routes for every host and router and sync the tables that changed."""
+    started = time.monotonic()
+    plan = await asyncio.to_thread(app.addressing.get, app.net, topology_revision())
+    tables = plan_static_routes(plan["nodes"], app.link_store.edges())
+    changed = {node_id: routes for node_id, routes in tables.items() if full or app.route_tables.get(node_id) != routes}
+    # Only routes the planner installed are replaced or removed; defaults set
+    # by hand or for a NAT stay unless the plan has its own.
+    results = await sync_desired_routes(changed, dry_run=not apply, owner=PLANNER_PROTO) if changed else {}
+    return {
+        "tables": tables,
+        "changed": sorted(changed),
+        "results": results,
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+
+def replan_static_routes() -> dict:
+    # Runs on the planner thread; planning itself happens on the server loop,
+    # like the plan endpoint, so both see the topology from the same thread.
+    return asyncio.run_coroutine_threadsafe(auto_static_routes(), app.loop).result()
+
+async def auto_static_routes() -> dict:
+    if not app.net.is_started:
+        return {"tables": {}, "changed": [], "results": {}, "elapsed": 0.0}
+    return await apply_static_routes()
+
+@app.post("/api/mininet/routing/plan")
+async def plan_routes(request: Optional[PlanRequest] = None):
+    """Compute static routes over the current topology and apply them"""
+    request = request or PlanRequest()
+    if not app.net.is_started:
+        raise HTTPException(status_code=400, detail="network must be started to plan routes")
+    return await apply_static_routes(apply=request.apply, full=request.full)
+
+@app.get("/api/mininet/routing/auto")
+def get_route_planner():
+    return app.route_planner.state()
+
+@app.put("/api/mininet/routing/auto")
+def set_route_planner(payload: PlannerUpdate):
+    """Re-plan static routes automatically after topology changes"""
+    app.route_planner.enable(payload.enabled)
+    return app.route_planner.state()
+
+def switch_of_version(switch: Switch) -> Optional[str]:
+    return None if switch.of_version in (None, "", "auto") else switch.of_version
+
+def proactive_switches() -> Dict[str, Optional[str]]:
+    """OVS switches without a controller, with the OpenFlow version to talk to them."""
+    # The node class decides: switch_type is unset for switches built
+    # with the default class. OVSBridge runs standalone and learns itself.
+    nodes = app.net.nameToNode
+    return {
+        switch_id: switch_of_version(switch)
+        for switch_id, switch in app.switches.items()
+        if not switch.controller
+        and isinstance(nodes.get(switch_id), OVSSwitch)
+        and not isinstance(nodes[switch_id], OVSBridge)
+    }
+
+def link_end(intf, macs: Dict[Tuple[str, str], Optional[str]]) -> LinkEnd:
+    node = intf.node
+    if getattr(node, "type", None) == "sw":
+        return (node.name, intf.name, node.ports.get(intf), None)
+    return (node.name, intf.name, None, macs.get((node.name, intf.name)))
+
+async def apply_proactive_flows(apply: bool = True, full: bool = False) -> dict:
+    """Plan shortest-path L2 flows for controller-less switches and install the changed ones."""
+    started = time.monotonic()
+    switches = proactive_switches()
+    plan = await asyncio.to_thread(app.addressing.get, app.net, topology_revision())
+    macs = {(node["id"], intf["name"]): intf["mac"] for node in plan["nodes"] for intf in node["intfs"]}
+    links = [
+        (link_end(link.intf1, macs), link_end(link.intf2, macs))
+        for link in list(app.link_store.links.values())
+        if getattr(link, "intf1", None) is not None and getattr(link, "intf2", None) is not None
+    ]
+    tables = plan_l2_flows(set(switches), links)
+    targets = {}
+    for switch_id, table in tables.items():
+        commands = flow_table_commands(None if full else app.proactive_flows.get(switch_id), table)
+        if commands:
+            targets[switch_id] = (commands, switches[switch_id])
+    for switch_id in list(app.proactive_flows):
+        # Switches that got a controller or were removed since the last plan.
+        if switch_id not in switches:
+            switch = app.switches.get(switch_id)
+            if switch_id in app.net.nameToNode and switch:
+                targets[switch_id] = (flow_table_commands(None, {}), switch_of_version(switch))
+            else:
+                app.proactive_flows.pop(switch_id, None)
+    errors = await install_flow_tables(targets) if apply and targets else {}
+    for switch_id, error in errors.items():
+        if error:
+            # Unknown state, reinstall the whole table next time.
+            app.proactive_flows.pop(switch_id, None)
+            continue
+        if switch_id in tables:
+            app.proactive_flows[switch_id] = tables[switch_id]
+        else:
+            app.proactive_flows.pop(switch_id, None)
+        flows_changed(switch_id, "update")
+    return {
+        "switches": sorted(switches),
+        "changed": sorted(targets),
+        "flows": {switch_id: len(table) for switch_id, table in tables.items()},
+        "errors": {switch_id: error for switch_id, error in errors.items() if error},
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+
+async def remove_proactive_flows() -> Dict[str, Optional[str]]:
+    targets = {
+        switch_id: (flow_table_commands(None, {}), switch_of_version(app.switches[switch_id]))
+        for switch_id in app.proactive_flows
+        if switch_id in app.switches and switch_id in app.net.nameToNode
+    }
+    app.proactive_flows.clear()
+    errors = await install_flow_tables(targets) if targets else {}
+    for switch_id, error in errors.items():
+        if not error:
+            flows_changed(switch_id, "delete")
+    return {switch_id: error for switch_id, error in errors.items() if error}
+
+def replan_proactive_flows() -> dict:
+    # Runs on the planner thread; see replan_static_routes.
+    return asyncio.run_coroutine_threadsafe(auto_proactive_flows(), app.loop).result()
+
+async def auto_proactive_flows() -> dict:
+    if not app.net.is_started:
+        return {"switches": [], "changed": [], "flows": {}, "errors": {}, "elapsed": 0.0}
+    return await apply_proactive_flows()
+
+@app.post("/api/mininet/forwarding/plan")
+async def plan_forwarding(request: Optional[PlanRequest] = None):
+    """Compute shortest-path flows for controller-less switches and install them"""
+    request = request or PlanRequest()
+    if not app.net.is_started:
+        raise HTTPException(status_code=400, detail="network must be started to install flows")
+    return await apply_proactive_flows(apply=request.apply, full=request.full)
+
+@app.get("/api/mininet/forwarding")
+def get_forwarding():
+    return {
+        **app.flow_planner.state(),
+        "switches": sorted(proactive_switches()),
+        "installed": {switch_id: len(table) for switch_id, table in app.proactive_flows.items()},
+        "cookie": hex(PROACTIVE_COOKIE),
+    }
+
+@app.put("/api/mininet/forwarding")
+async def set_forwarding(payload: PlannerUpdate):
+    """Keep proactive flows installed and recompute them after topology changes"""
+    app.flow_planner.enable(payload.enabled)
+    errors = {}
+    if not payload.enabled and app.net.is_started:
+        errors = await remove_proactive_flows()
+    return {**get_forwarding(), "errors": errors}
+
+@app.get("/api/mininet/routes/{node_id}")
+def get_routes(node_id: str):
+    """Desired (last applied) and current route table of a host or router"""
+    if not app.net.is_started:
+        raise HTTPException(status_code=400, detail="network must be started to manage routes")
+    node = routed_node(node_id)
+    state = read_netstate(namespace_pid(node))
+    return {
+        "node": node_id,
+        "desired": app.route_tables.get(node_id),
+        "routes": state["routes"],
+        "error": state["error"],
+    }
+
+@app.put("/api/mininet/routes/{node_id}")
+async def put_routes(node_id: str, payload: RouteTableUpdate):
+    """Make the route table of one node match the given one"""
+    results = await apply_route_tables({node_id: payload.routes}, payload.dry_run)
+    return results[node_id]
+
+@app.put("/api/mininet/routes")
+async def put_route_tables(payload: RouteTablesUpdate):
+    """Make the route tables of many nodes match, applied in parallel"""
+    return await apply_route_tables(payload.tables, payload.dry_run)
+
+@app.get("/api/mininet/executor")
+def get_executor_metrics():
+    """Queue depth and wait/run latencies of node commands"""
+    return app.executor.metrics()
+
 @app.get("/api/mininet/stats/{node_id}")
-def get_node_stats(node_id: str):
+async def get_node_stats(node_id: str):
     if node_id not in app.net.nameToNode:
         raise HTTPException(status_code=404, detail=f"Node {node_id} not found")
     
     node = app.net.nameToNode[node_id]
-    base_data = app.switches.get(node_id) or app.hosts.get(node_id) or app.controllers.get(node_id) or app.nats.get(node_id) or app.routers.get(node_id)
+    base_data = app.registry.get(node_id)
     if not base_data:
         raise HTTPException(status_code=404, detail=f"Node {node_id} not found")
     result = dict(**base_data.model_dump())
 
     if node.type == "sw":
-        ports_raw = node.dpctl("dump-ports")
-        ports_raw = ports_raw[ports_raw.find("\n") + 1:].replace("\n", " ")
-        result["ports"] = [p.strip() for p in ports_raw.split("port") if "LOCAL" not in p and p.strip()]
-
-        flow_table_raw = node.dpctl("dump-flows").strip()
-        parsed_flows = []
-
-        for line in flow_table_raw.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-            flow = {}
-            match_fields = {}
-            actions = None
-
-            if " actions=" in line:
-                line, actions = line.split(" actions=", 1)
-            elif "actions=" in line:
-                line, actions = line.split("actions=", 1)
-
-            if actions is not None:
-                flow["actions"] = actions.strip()
-
-            fields = [f.strip() for f in line.split(",") if f.strip()]
-            for field in fields:
-                if "=" in field:
-                    key, value = field.split("=", 1)
-                    if key in FLOW_FIELDS:
-                        flow[key] = value
-                    else:
-                        match_fields[key] = value
-                else:
-                    match_fields[field] = True
-
-            flow["match_fields"] = match_fields
-            parsed_flows.append(flow)
-        result["flow_table"] = parsed_flows
+        ports, flows = await async_node_command(
+            node_id, lambda: (node.dpctl("dump-ports"), node.dpctl("dump-flows")), label="stats"
+        )
+        result["ports"] = parse_port_stats(ports)
+        result["flow_table"] = parse_flow_dump(flows.strip())
     elif node.type in ("host", "router"):
-        arp_table = node.cmd("arp -a -n")
-        print("ARP TABLE", arp_table)
-        parsed_arp_table = []
-        for line in arp_table.splitlines():
-            parts = line.split()
-            if len(parts) < 6:
-                continue
-            ip = parts[1].strip("()")
-            mac = parts[3]
-            interface = parts[-1]
-            parsed_arp_table.append({"ip": ip, "mac": mac, "interface": interface})
-        result["arp_table"] = parsed_arp_table
-        default_route = node.cmd("ip route show default").strip()
-        result["default_route"] = default_route
+        # Read with ip -batch outside the node shell, so not queued.
+        state = await async_read_netstate(namespace_pid(node))
+        result["arp_table"] = state["neighbors"]
+        result["routes"] = state["routes"]
+        result["links"] = state["links"]
+        result["netstate_error"] = state["error"]
+        default_route = next((route for route in state["routes"] if route["dst"] == "default"), None)
+        result["default_route"] = format_route(default_route) if default_route else ""
         interfaces = []
         try:
-            interfaces = [intf.name for intf in node.intfList() if intf.name != "lo"]
+            interfaces = list(app.registry.interfaces(node))
         except Exception:
             interfaces = []
         result["interfaces"] = interfaces
@@ -1172,6 +1816,7 @@ def add_flow(rule: FlowRuleCreate):
     if result.returncode != 0:
         detail = (result.stderr or result.stdout or "ovs-ofctl add-flow failed").strip()
         raise HTTPException(status_code=400, detail=detail)
+    flows_changed(rule.switch, "add")
 
     return {"status": "ok", "flow": flow}
 
@@ -1215,6 +1860,7 @@ def delete_flows(rule: FlowRuleDelete):
     if result.returncode != 0:
         detail = (result.stderr or result.stdout or "ovs-ofctl del-flows failed").strip()
         raise HTTPException(status_code=400, detail=detail)
+    flows_changed(rule.switch, "delete")
 
     return {"status": "ok", "match": match or "all"}
 
@@ -1251,6 +1897,7 @@ def delete_flow_by_id(switch_id: str, flow_id: int):
     if result.returncode != 0:
         detail = (result.stderr or result.stdout or "ovs-ofctl del-flows failed").strip()
         raise HTTPException(status_code=400, detail=detail)
+    flows_changed(switch_id, "delete")
     return {"status": "ok", "match": match}
 
 @app.post("/api/mininet/iperf")
@@ -1280,10 +1927,11 @@ def run_iperf(request: IperfRequest):
 
     app.iperf_running = True
     try:
-        result = app.net.iperf(
-            hosts=[client_node, server_node],
-            l4Type=request.l4_type or "TCP",
-            **kwargs,
+        result = node_command(
+            (request.client, request.server),
+            lambda: app.net.iperf(hosts=[client_node, server_node], l4Type=request.l4_type or "TCP", **kwargs),
+            timeout=(request.seconds or 5) + COMMAND_TIMEOUT,
+            label="iperf",
         )
         if isinstance(result, (list, tuple)) and len(result) >= 2:
             return {"client": result[0], "server": result[1]}
@@ -1291,6 +1939,142 @@ def run_iperf(request: IperfRequest):
     finally:
         app.iperf_running = False
 
+def build_iperf_campaign(request: IperfCampaignRequest) -> IperfCampaign:
+    if not app.net.is_started:
+        raise HTTPException(status_code=400, detail="network must be started to run iperf")
+    hosts = {host.name: (host.name, host.pid, host.IP()) for host in app.net.hosts if getattr(host, "type", None) == "host"}
+    if request.pairs:
+        pairs = [tuple(pair) for pair in request.pairs]
+    elif request.pattern:
+        names = request.hosts or sorted(hosts)
+        missing = [name for name in names if name not in hosts]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"hosts not found: {', '.join(missing)}")
+        try:
+            pairs = campaign_pairs(request.pattern, names)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    else:
+        raise HTTPException(status_code=400, detail="either pairs or pattern is required")
+    if not pairs:
+        raise HTTPException(status_code=400, detail="campaign has no flows")
+    for client, server in pairs:
+        if client == server:
+            raise HTTPException(status_code=400, detail="client and server must be different hosts")
+        if client not in hosts or server not in hosts:
+            raise HTTPException(status_code=404, detail=f"client or server host not found: {client}->{server}")
+        if not hosts[server][2]:
+            raise HTTPException(status_code=400, detail=f"server {server} has no IP address")
+    if app.traffic.active_flows() + len(pairs) > app.traffic.max_flows:
+        raise HTTPException(status_code=409, detail=f"at most {app.traffic.max_flows} concurrent iperf flows")
+    return IperfCampaign(
+        list(hosts.values()),
+        pairs,
+        l4_type=request.l4_type or "TCP",
+        udp_bw=request.udp_bw,
+        seconds=request.seconds or 5,
+        base_port=request.base_port or IPERF_BASE_PORT,
+        interval=request.interval,
+        ports=app.traffic.ports,
+    )
+
+@app.post("/api/mininet/iperf/campaigns")
+async def start_iperf_campaign(request: IperfCampaignRequest):
+    campaign = app.traffic.start(build_iperf_campaign(request))
+    if request.wait:
+        await campaign.wait()
+    return campaign.summary()
+
+@app.get("/api/mininet/iperf/campaigns")
+def list_iperf_campaigns():
+    return {"campaigns": app.traffic.list()}
+
+@app.get("/api/mininet/iperf/campaigns/{campaign_id}")
+def get_iperf_campaign(campaign_id: str):
+    campaign = app.traffic.get(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail=f"iperf campaign {campaign_id} not found")
+    return campaign.summary()
+
+@app.delete("/api/mininet/iperf/campaigns/{campaign_id}")
+async def cancel_iperf_campaign(campaign_id: str):
+    campaign = app.traffic.get(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail=f"iperf campaign {campaign_id} not found")
+    campaign.cancel()
+    return {"status": "ok"}
+
+async def stream_iperf_campaign(websocket: WebSocket, campaign: IperfCampaign):
+    """Relay campaign samples until it finishes; a {"action": "cancel"} message stops it"""
+    queue = campaign.subscribe()
+
+    async def receive_commands():
+        try:
+            while True:
+                try:
+                    message = json.loads(await websocket.receive_text())
+                except ValueError:
+                    continue
+                if isinstance(message, dict) and message.get("action") == "cancel":
+                    campaign.cancel()
+        except Exception:
+            # Disconnected; the caller notices the finished task.
+            return
+
+    commands = asyncio.create_task(receive_commands())
+    try:
+        await websocket.send_json({"type": "start", **campaign.summary()})
+        while True:
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({getter, commands}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                # The client went away; the campaign keeps running.
+                getter.cancel()
+                break
+            message = getter.result()
+            await websocket.send_json(message)
+            if message["type"] == "done":
+                await websocket.close()
+                break
+    except WebSocketDisconnect:
+        pass
+    except Exception as exc:
+        debug(f"Iperf WebSocket error: {exc}")
+    finally:
+        commands.cancel()
+        campaign.unsubscribe(queue)
+
+@app.websocket("/api/mininet/iperf/stream")
+async def websocket_iperf(websocket: WebSocket):
+    """Start a campaign from the first message and stream its interval reports"""
+    await websocket.accept()
+    try:
+        request = IperfCampaignRequest(**await websocket.receive_json())
+        if request.interval is None:
+            request.interval = 1.0
+        campaign = app.traffic.start(build_iperf_campaign(request))
+    except WebSocketDisconnect:
+        return
+    except HTTPException as exc:
+        await websocket.send_json({"type": "error", "detail": exc.detail})
+        await websocket.close()
+        return
+    except Exception as exc:
+        await websocket.send_json({"type": "error", "detail": str(exc)})
+        await websocket.close()
+        return
+    await stream_iperf_campaign(websocket, campaign)
+
+@app.websocket("/api/mininet/iperf/campaigns/{campaign_id}/stream")
+async def websocket_iperf_campaign(websocket: WebSocket, campaign_id: str):
+    await websocket.accept()
+    campaign = app.traffic.get(campaign_id)
+    if campaign is None:
+        await websocket.send_json({"type": "error", "detail": f"iperf campaign {campaign_id} not found"})
+        await websocket.close()
+        return
+    await stream_iperf_campaign(websocket, campaign)
+
 @app.get("/api/mininet/export_script", response_class=PlainTextResponse)
 def export_network():
     debug(app.net)
@@ -1410,28 +2194,61 @@ async def import_json(file: UploadFile = File(...)):
     except json.JSONDecodeError:
         return {"error": "Invalid JSON file"}, 400
 
-async def read_pty(master_fd, websocket: WebSocket):
-    """Reads PTY output and sends it to WebSocket"""
+def terminal_sender(websocket: WebSocket, binary: bool = False):
+    """Returns a callback that sends PTY output to WebSocket"""
+    if binary:
+        async def send(data: bytes):
+            await websocket.send_bytes(encode_frame(FRAME_DATA, data))
+    else:
+        # Incremental decoding keeps UTF-8 sequences split across reads intact.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        async def send(data: bytes):
+            text = decoder.decode(data)
+            if text:
+                await websocket.send_text(text)
+
+    return send
+
+
+async def handle_terminal_frame(session: TerminalSession, token: int, frame: bytes):
+    if not frame:
+        return
+    frame_type, payload = frame[0], frame[1:]
+    if frame_type == FRAME_DATA:
+        await session.write(payload)
+    elif frame_type == FRAME_RESIZE and len(payload) >= 4:
+        rows, cols = struct.unpack("!HH", payload[:4])
+        if rows and cols:
+            session.resize(rows, cols)
+    elif frame_type == FRAME_PAUSE:
+        session.pause(token)
+    elif frame_type == FRAME_RESUME:
+        session.resume(token)
+
+
+def open_node_shell(node_id: str):
+    node = app.net.get(node_id)
+    master_fd, slave_fd = pty.openpty()
+    env = dict(os.environ)
+    env["PS1"] = f"root@{node_id}:\\w$ "
     try:
-        while True:
-            await asyncio.sleep(0.01)
-            try:
-                r, _, _ = select.select([master_fd], [], [], 0)
-            except OSError as e:
-                if getattr(e, "errno", None) == 9:
-                    break
-                raise
-            if master_fd in r:
-                try:
-                    output = os.read(master_fd, 1024).decode(errors="ignore")
-                except OSError as e:
-                    if getattr(e, "errno", None) == 9:
-                        break
-                    raise
-                if output:
-                    await websocket.send_text(output)
-    except Exception as e:
-        debug(f"PTY Read Error: {e}")
+        process = node.popen(
+            ["/bin/bash", "--noprofile", "--norc", "-i"],
+            stdin=slave_fd,
+            stdout=slave_fd,
+            stderr=slave_fd,
+            text=True,
+            close_fds=True,
+            env=env,
+        )
+    except Exception:
+        os.close(master_fd)
+        raise
+    finally:
+        os.close(slave_fd)
+    return master_fd, process
+
 
 async def read_sniffer(process: asyncio.subprocess.Process, websocket: WebSocket):
     """Reads tcpdump output and sends it to WebSocket"""
@@ -1481,8 +2298,15 @@ async def start_sniffer_process(node_pid: int, intf: str, pcap_path: str):
 
 @app.websocket("/api/mininet/terminal/{node_id}")
 async def websocket_terminal(websocket: WebSocket, node_id: str):
-    """WebSocket endpoint for accessing a Mininet node terminal"""
+    """WebSocket endpoint for accessing a Mininet node terminal
+
+    With ?protocol=binary output is sent as binary frames (see terminals.py)
+    and the client may send DATA, RESIZE, PAUSE and RESUME frames; plain text
+    messages are always accepted as keyboard input. With ?session=<name> the
+    shell is kept after disconnect and reconnecting replays its scrollback.
+    """
     await websocket.accept()
+    binary = websocket.query_params.get("protocol") == "binary"
     if not getattr(app.net, "is_started", False):
         await websocket.send_text("Error: network must be started to open a webshell.")
         await websocket.close()
@@ -1495,68 +2319,85 @@ async def websocket_terminal(websocket: WebSocket, node_id: str):
         await websocket.close()
         return
 
-    master_fd, slave_fd = pty.openpty()
+    try:
+        session = app.terminals.open(node_id, websocket.query_params.get("session"))
+    except Exception as exc:
+        await websocket.send_text(f"Error: could not open a shell on {node_id}: {exc}")
+        await websocket.close()
+        return
+    token = await session.attach(terminal_sender(websocket, binary=binary))
 
-    env = dict(os.environ)
-    env["PS1"] = f"root@{node_id}:\\w$ "
-    process = node.popen(
-        ["/bin/bash", "--noprofile", "--norc", "-i"],
-        stdin=slave_fd,
-        stdout=slave_fd,
-        stderr=slave_fd,
-        text=True,
-        close_fds=True,
-        env=env,
-    )
+    async def receive_input():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                await handle_terminal_frame(session, token, message["bytes"])
+            elif message.get("text"):
+                await session.write(message["text"].encode())
+
+    input_task = asyncio.create_task(receive_input())
+    closed_task = asyncio.create_task(session.wait_closed())
+    try:
+        await asyncio.wait({input_task, closed_task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        input_task.cancel()
+        closed_task.cancel()
+        app.terminals.release(session, token)
+    if session.closed:
+        try:
+            await websocket.close()
+        except Exception:
+            pass
 
-    session_id = f"{node_id}-{uuid.uuid4().hex}"
-    sessions = app.terminals.get(node_id, {})
-    sessions[session_id] = (master_fd, process)
-    app.terminals[node_id] = sessions
 
-    asyncio.create_task(read_pty(master_fd, websocket))
+@app.get("/api/mininet/terminals")
+def list_terminals():
+    return {"sessions": app.terminals.list()}
+
+
+@app.get("/api/mininet/terminals/{node_id}")
+def list_node_terminals(node_id: str):
+    return {"sessions": app.terminals.list(node_id)}
 
-    try:
-        while True:
-            data = await websocket.receive_text()
-            debug("RECEIVED",data.encode())
-            os.write(master_fd, data.encode())
-    except WebSocketDisconnect:
-        process.terminate()
-        os.close(master_fd)
-        sessions = app.terminals.get(node_id, {})
-        sessions.pop(session_id, None)
-        if not sessions:
-            app.terminals.pop(node_id, None)
-        else:
-            app.terminals[node_id] = sessions
-        print(f"Closed terminal session for {node_id} ({session_id})")
+
+@app.delete("/api/mininet/terminals/{node_id}/{name}")
+def kill_terminal(node_id: str, name: str):
+    if not app.terminals.kill(node_id, name):
+        raise HTTPException(status_code=404, detail="terminal session not found")
+    return {"status": "ok"}
+
+@app.get("/api/mininet/logs/level")
+def get_log_level():
+    return LOG_PIPELINE.stats()
+
+@app.put("/api/mininet/logs/level")
+def set_log_level(update: LogLevelUpdate):
+    value = update.level.strip()
+    if not value.isdigit() and not isinstance(logging.getLevelName(value.upper()), int):
+        raise HTTPException(status_code=400, detail=f"Invalid log level: {update.level}")
+    LOG_PIPELINE.set_level(parse_level(value))
+    return LOG_PIPELINE.stats()
 
 @app.websocket("/api/mininet/logs")
 async def websocket_logs(websocket: WebSocket):
+    """Streams log lines in batches; filter with ?level=INFO and ?logger=mininet"""
     await websocket.accept()
-    if not os.path.exists(LOG_FILE):
-        clear_log_file()
-    process = await asyncio.create_subprocess_exec(
-        "tail",
-        "-n",
-        "1000",
-        "-f",
-        LOG_FILE,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-    )
+    level = parse_level(websocket.query_params.get("level"))
+    logger_name = websocket.query_params.get("logger") or None
+    subscription = LOG_BUS.subscribe(level, logger_name)
     try:
+        history = LOG_BUS.history(level, logger_name)
+        if history:
+            await websocket.send_text("\n".join(history))
         while True:
-            line = await process.stdout.readline()
-            if not line:
-                await asyncio.sleep(0.05)
-                continue
-            await websocket.send_text(line.decode(errors="ignore").rstrip())
+            lines = await LOG_BUS.next_batch(subscription)
+            await websocket.send_text("\n".join(lines))
     except WebSocketDisconnect:
         pass
     finally:
-        process.terminate()
+        LOG_BUS.unsubscribe(subscription)
 
 @app.websocket("/api/mininet/sniffer")
 async def websocket_sniffer(websocket: WebSocket):
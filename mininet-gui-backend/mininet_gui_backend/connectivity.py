@@ -0,0 +1,322 @@
+import asyncio
+import re
+import shutil
+import statistics
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from mininet_gui_backend.utils import namespace_command
+
+
+PING_COUNT = 1
+PING_TIMEOUT_SECONDS = 1.0
+PING_CONCURRENCY = 64
+
+PING_SENT_RE = re.compile(r"(\d+) packets transmitted, (\d+) (?:packets )?received")
+PING_RTT_RE = re.compile(r"= ([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+)")
+FPING_LINE_RE = re.compile(r"^(\S+)\s+:\s+((?:[\d.]+|-)(?:\s+(?:[\d.]+|-))*)\s*$")
+
+# (name, pid, ip) of a host taking part in a sweep.
+PingHost = Tuple[str, int, Optional[str]]
+ResultCallback = Callable[[dict], Awaitable[None]]
+
+
+def ping_result(src: str, dst: str, sent: int, received: int, rtts: Optional[List[float]] = None) -> dict:
+    rtts = rtts or []
+    return {
+        "src": src,
+        "dst": dst,
+        "sent": sent,
+        "received": received,
+        "rtt_min": min(rtts) if rtts else 0.0,
+        "rtt_avg": sum(rtts) / len(rtts) if rtts else 0.0,
+        "rtt_max": max(rtts) if rtts else 0.0,
+        "rtt_mdev": statistics.pstdev(rtts) if len(rtts) > 1 else 0.0,
+    }
+
+
+def parse_ping(src: str, dst: str, output: str, count: int) -> dict:
+    sent = received = 0
+    match = PING_SENT_RE.search(output)
+    if match:
+        sent, received = int(match.group(1)), int(match.group(2))
+    result = ping_result(src, dst, sent or count, received)
+    match = PING_RTT_RE.search(output)
+    if match and received:
+        rtt_min, rtt_avg, rtt_max, rtt_mdev = map(float, match.groups())
+        result.update(rtt_min=rtt_min, rtt_avg=rtt_avg, rtt_max=rtt_max, rtt_mdev=rtt_mdev)
+    return result
+
+
+def parse_fping(output: str) -> Dict[str, List[Optional[float]]]:
+    """Per-target samples from ``fping -C`` output, None marks a lost probe."""
+    samples = {}
+    for line in output.splitlines():
+        match = FPING_LINE_RE.match(line.strip())
+        if match:
+            samples[match.group(1)] = [None if token == "-" else float(token) for token in match.group(2).split()]
+    return samples
+
+
+def format_ping_text(results: List[dict]) -> str:
+    """Render results in the same layout as the pingFull based pingall."""
+    return "\n".join(
+        f"{r['src']}->{r['dst']}: {r['sent']}/{r['received']}, "
+        f"rtt min/avg/max/mdev {r['rtt_min']:.3f}/{r['rtt_avg']:.3f}/{r['rtt_max']:.3f}/{r['rtt_mdev']:.3f} ms"
+        for r in results
+    )
+
+
+def ping_matrix(names: List[str], results: Iterable[dict], elapsed: float = 0.0) -> dict:
+    """Compact N x N view: packet loss percentage and average RTT per pair."""
+    index = {name: i for i, name in enumerate(names)}
+    loss: List[List[Optional[int]]] = [[None] * len(names) for _ in names]
+    rtt: List[List[Optional[float]]] = [[None] * len(names) for _ in names]
+    sent = received = 0
+    for result in results:
+        i, j = index.get(result["src"]), index.get(result["dst"])
+        if i is None or j is None:
+            continue
+        sent += result["sent"]
+        received += result["received"]
+        loss[i][j] = round(100 * (result["sent"] - result["received"]) / result["sent"]) if result["sent"] else 100
+        rtt[i][j] = round(result["rtt_avg"], 3) if result["received"] else None
+    return {
+        "hosts": names,
+        "loss": loss,
+        "rtt": rtt,
+        "sent": sent,
+        "received": received,
+        "dropped_pct": round(100 * (sent - received) / sent, 2) if sent else 0.0,
+        "elapsed": round(elapsed, 3),
+    }
+
+
+class PingSweep:
+    """All-pairs ping where every source probes its targets concurrently.
+
+    With ``fping`` installed each source runs a single multi-target probe
+    inside its namespace; otherwise one ``ping`` per pair is started. At most
+    ``concurrency`` probe processes run at the same time, and results are
+    handed to ``on_result`` as soon as their probe finishes.
+    """
+
+    def __init__(
+        self,
+        hosts: List[PingHost],
+        count: int = PING_COUNT,
+        timeout: float = PING_TIMEOUT_SECONDS,
+        concurrency: int = PING_CONCURRENCY,
+        pairs: Optional[List[Tuple[str, str]]] = None,
+    ):
+        self.hosts = hosts
+        self.count = max(1, count)
+        self.timeout = max(0.1, timeout)
+        self.concurrency = max(1, concurrency)
+        self.use_fping = shutil.which("fping") is not None
+        self.results: List[dict] = []
+        self.elapsed = 0.0
+        self._by_name = {name: (pid, ip) for name, pid, ip in hosts}
+        if pairs is None:
+            pairs = [(src, dst) for src, _, _ in hosts for dst, _, _ in hosts if src != dst]
+        self.pairs = [(src, dst) for src, dst in pairs if src in self._by_name and dst in self._by_name]
+
+    async def run(self, on_result: Optional[ResultCallback] = None) -> List[dict]:
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        targets: Dict[str, List[str]] = {}
+        for src, dst in self.pairs:
+            targets.setdefault(src, []).append(dst)
+
+        async def emit(result: dict):
+            self.results.append(result)
+            if on_result is not None:
+                await on_result(result)
+
+        async def probe_source(src: str, dsts: List[str]):
+            unaddressed = [dst for dst in dsts if not self._by_name[dst][1]]
+            for dst in unaddressed:
+                await emit(ping_result(src, dst, self.count, 0))
+            dsts = [dst for dst in dsts if dst not in unaddressed]
+            if not dsts:
+                return
+            if self.use_fping:
+                async with semaphore:
+                    results = await self._fping(src, dsts)
+                for result in results:
+                    await emit(result)
+            else:
+                await asyncio.gather(*(probe_pair(src, dst) for dst in dsts))
+
+        async def probe_pair(src: str, dst: str):
+            async with semaphore:
+                result = await self._ping(src, dst)
+            await emit(result)
+
+        tasks = [asyncio.ensure_future(probe_source(src, dsts)) for src, dsts in targets.items()]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # A failing callback (e.g. a closed WebSocket) stops the whole sweep.
+            for task in tasks:
+                task.cancel()
+            self.elapsed = time.monotonic() - started
+        return self.results
+
+    def matrix(self) -> dict:
+        return ping_matrix([name for name, _, _ in self.hosts], self.results, self.elapsed)
+
+    async def _fping(self, src: str, dsts: List[str]) -> List[dict]:
+        pid = self._by_name[src][0]
+        ips = {self._by_name[dst][1]: dst for dst in dsts}
+        timeout_ms = str(int(self.timeout * 1000))
+        output = await self._exec(
+            pid,
+            ["fping", "-C", str(self.count), "-q", "-t", timeout_ms, "-p", "100", "-i", "1", *ips],
+            self.count * (self.timeout + 0.1) + len(ips) * 0.01 + 2,
+        )
+        samples = parse_fping(output)
+        results = []
+        for ip, dst in ips.items():
+            rtts = [rtt for rtt in samples.get(ip, []) if rtt is not None]
+            results.append(ping_result(src, dst, self.count, len(rtts), rtts))
+        return results
+
+    async def _ping(self, src: str, dst: str) -> dict:
+        pid = self._by_name[src][0]
+        ip = self._by_name[dst][1]
+        wait = str(max(1, int(round(self.timeout))))
+        output = await self._exec(
+            pid,
+            ["ping", "-n", "-q", "-c", str(self.count), "-i", "0.2", "-W", wait, ip],
+            self.count * 0.2 + self.timeout + 2,
+        )
+        return parse_ping(src, dst, output, self.count)
+
+    async def _exec(self, pid: int, cmd: List[str], deadline: float) -> str:
+        process = await asyncio.create_subprocess_exec(
+            *namespace_command(pid, cmd), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), deadline)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return ""
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        return stdout.decode(errors="ignore")
+
+
+class ReachabilityCache:
+    """Last ping result per host pair, with change-driven invalidation.
+
+    Topology changes only record the nodes they touched. A touched node
+    that does not forward traffic (``transit`` is false, e.g. a host) can
+    only change pairs it is an end of, so just those are re-probed. For
+    other touched nodes the connected components around them are walked
+    with ``neighbors``, without passing through non-transit nodes, and the
+    pairs with both ends inside are re-probed: a change cannot alter
+    reachability between hosts outside the components it touched. Pairs
+    that were never probed are always included.
+    """
+
+    def __init__(
+        self,
+        neighbors: Callable[[str], Iterable[str]],
+        transit: Callable[[str], bool] = lambda node_id: True,
+    ):
+        self._neighbors = neighbors
+        self._transit = transit
+        self._results: Dict[Tuple[str, str], dict] = {}
+        self._seeds: Set[str] = set()
+        self._all_dirty = True
+        self._lock = threading.Lock()
+
+    def mark(self, *node_ids: str):
+        with self._lock:
+            self._seeds.update(node_ids)
+
+    def mark_all(self):
+        with self._lock:
+            self._all_dirty = True
+
+    def forget(self, node_id: str):
+        with self._lock:
+            self._seeds.discard(node_id)
+            for pair in [pair for pair in self._results if node_id in pair]:
+                del self._results[pair]
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._seeds.clear()
+            self._all_dirty = True
+
+    def plan(self, hosts: List[str], full: bool = False) -> Tuple[List[Tuple[str, str]], Optional[Set[str]]]:
+        """Pairs to re-probe and the consumed seeds (None for a full sweep).
+
+        The seeds must be handed back to :meth:`restore` if the probe fails.
+        """
+        with self._lock:
+            seeds, self._seeds = self._seeds, set()
+            full = full or self._all_dirty
+            self._all_dirty = False
+            cached = set(self._results)
+        all_pairs = [(src, dst) for src in hosts for dst in hosts if src != dst]
+        if full:
+            return all_pairs, None
+        leaves = {seed for seed in seeds if not self._transit(seed)}
+        try:
+            affected = self._component(seeds - leaves)
+        except RuntimeError:
+            # Adjacency changed under us, fall back to a full sweep.
+            return all_pairs, None
+        dirty_hosts = [host for host in hosts if host in affected]
+        pairs = {(src, dst) for src in dirty_hosts for dst in dirty_hosts if src != dst}
+        pairs.update(pair for pair in all_pairs if pair[0] in leaves or pair[1] in leaves or pair not in cached)
+        return sorted(pairs), seeds
+
+    def restore(self, seeds: Optional[Set[str]]):
+        """Undo a :meth:`plan` whose probe did not complete."""
+        with self._lock:
+            if seeds is None:
+                self._all_dirty = True
+            else:
+                self._seeds.update(seeds)
+
+    def store(self, results: Iterable[dict], complete: bool = False):
+        """Record probe results; ``complete`` replaces every cached pair.
+
+        A complete sweep must have been planned with ``plan(full=True)``,
+        which consumed the changes it covers.
+        """
+        checked_at = time.time()
+        with self._lock:
+            if complete:
+                # Changes recorded while the sweep ran stay marked.
+                self._results.clear()
+            for result in results:
+                self._results[(result["src"], result["dst"])] = {**result, "checked_at": checked_at}
+
+    def results(self, hosts: List[str]) -> List[dict]:
+        names = set(hosts)
+        with self._lock:
+            return [result for (src, dst), result in self._results.items() if src in names and dst in names]
+
+    def pending(self) -> dict:
+        with self._lock:
+            return {"all": self._all_dirty, "nodes": sorted(self._seeds)}
+
+    def _component(self, seeds: Set[str]) -> Set[str]:
+        seen = set(seeds)
+        stack = list(seeds)
+        while stack:
+            for neighbor in self._neighbors(stack.pop()):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    if self._transit(neighbor):
+                        stack.append(neighbor)
+        return seen
@@ -0,0 +1,273 @@
+import json
+import subprocess
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from mininet.node import OVSBridge
+
+
+CONVERGENCE_TIMEOUT = 10.0
+POLL_INTERVAL = 0.5
+IDLE_POLL_INTERVAL = 5.0
+
+
+def _ovs_value(value):
+    """Decode an OVSDB JSON value: ["set", [...]], ["uuid", id] or an atom."""
+    if isinstance(value, list) and len(value) == 2:
+        kind, inner = value
+        if kind == "set":
+            return [_ovs_value(item) for item in inner]
+        if kind in ("uuid", "named-uuid"):
+            return inner
+        if kind == "map":
+            return {k: _ovs_value(v) for k, v in inner}
+    return value
+
+
+def parse_ovs_tables(output: str) -> List[List[dict]]:
+    """Rows of every table printed by ``ovs-vsctl --format=json`` with several commands."""
+    decoder = json.JSONDecoder()
+    tables = []
+    index = 0
+    while True:
+        while index < len(output) and output[index].isspace():
+            index += 1
+        if index >= len(output):
+            return tables
+        table, index = decoder.raw_decode(output, index)
+        headings = table.get("headings", [])
+        tables.append([dict(zip(headings, map(_ovs_value, row))) for row in table.get("data", [])])
+
+
+def read_controller_status() -> Dict[str, List[dict]]:
+    """Controllers of every OVS bridge with their ``is_connected`` flag."""
+    result = subprocess.run(
+        [
+            "ovs-vsctl", "--format=json",
+            "--", "--columns=name,controller", "list", "Bridge",
+            "--", "--columns=_uuid,target,is_connected", "list", "Controller",
+        ],
+        text=True,
+        capture_output=True,
+        timeout=5,
+    )
+    if result.returncode != 0:
+        raise RuntimeError((result.stderr or result.stdout or "ovs-vsctl failed").strip())
+    bridges, controllers = parse_ovs_tables(result.stdout)
+    by_uuid = {row["_uuid"]: row for row in controllers}
+    status = {}
+    for bridge in bridges:
+        uuids = bridge.get("controller")
+        uuids = uuids if isinstance(uuids, list) else [uuids]
+        status[bridge["name"]] = [
+            {"target": by_uuid[uuid].get("target"), "connected": by_uuid[uuid].get("is_connected") is True}
+            for uuid in uuids
+            if uuid in by_uuid
+        ]
+    return status
+
+
+class SwitchConnectionTracker:
+    """Tracks whether switches are connected to their controllers.
+
+    ``ovsdb-client monitor`` on the Controller table wakes the tracker up
+    whenever a connection state changes; the state itself is then read in
+    one ``ovs-vsctl`` call. Without ovsdb-client the tracker polls. Only
+    switches returned by the ``switches`` callable given to :meth:`activate`
+    are tracked; it is asked again on every evaluation, so switches and
+    controller associations changed later are picked up. A fabric counts
+    as converged once each tracked switch with a controller is connected to
+    at least one.
+    """
+
+    def __init__(
+        self,
+        on_change: Optional[Callable[[str, dict], None]] = None,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self._on_change = on_change
+        self.poll_interval = poll_interval
+        self._expected: Callable[[], Dict[str, bool]] = dict
+        self._switches: Dict[str, dict] = {}
+        self._active = False
+        self._started_at: Optional[float] = None
+        self._converged_at: Optional[float] = None
+        self._error: Optional[str] = None
+        self._cond = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._monitor: Optional[subprocess.Popen] = None
+        self._monitor_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="switch-connections", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        self._stop_monitor()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def activate(self, switches: Callable[[], Dict[str, bool]]):
+        """Track the switches ``switches()`` maps to whether they were given a controller."""
+        with self._cond:
+            self._expected = switches
+            self._switches = {}
+            self._active = True
+            self._started_at = time.monotonic()
+            self._converged_at = None
+            self._error = None
+        self._ensure_monitor()
+        self._wake.set()
+
+    def deactivate(self):
+        with self._cond:
+            self._active = False
+            self._expected = dict
+            self._switches = {}
+            self._started_at = self._converged_at = None
+            self._cond.notify_all()
+        self._stop_monitor()
+
+    def wake(self):
+        """Re-read the tracked switches and their state now, e.g. after an edit."""
+        self._wake.set()
+
+    @property
+    def converged(self) -> bool:
+        with self._cond:
+            return self._is_converged()
+
+    def wait(self, timeout: float = CONVERGENCE_TIMEOUT) -> bool:
+        self._wake.set()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._active and not self._is_converged():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return self._active
+
+    def state(self) -> dict:
+        with self._cond:
+            converged_after = None
+            if self._converged_at is not None and self._started_at is not None:
+                converged_after = round(self._converged_at - self._started_at, 3)
+            return {
+                "active": self._active,
+                "converged": self._active and self._is_converged(),
+                "converged_after": converged_after,
+                "switches": {name: dict(entry) for name, entry in self._switches.items()},
+                "error": self._error,
+            }
+
+    def refresh(self):
+        if not self._active:
+            return
+        try:
+            status = read_controller_status()
+            error = None
+        except Exception as exc:
+            status, error = None, str(exc)
+        changes = []
+        with self._cond:
+            self._error = error
+            if status is None or not self._active:
+                return
+            expected = self._expected()
+            for name in [name for name in self._switches if name not in expected]:
+                del self._switches[name]
+            for name, has_controller in expected.items():
+                controllers = status.get(name)
+                entry = {
+                    "tracked": controllers is not None,
+                    "controllers": controllers or [],
+                    "connected": bool(controllers) and any(c["connected"] for c in controllers),
+                    "required": has_controller and controllers is not None,
+                }
+                previous = self._switches.get(name)
+                if previous is None or {k: v for k, v in previous.items() if k != "since"} != entry:
+                    entry["since"] = time.time()
+                    self._switches[name] = entry
+                    changes.append((name, dict(entry)))
+            if not self._is_converged():
+                self._converged_at = None
+            elif self._converged_at is None:
+                self._converged_at = time.monotonic()
+            self._cond.notify_all()
+        if self._on_change is not None:
+            for name, entry in changes:
+                self._on_change(name, entry)
+
+    def _is_converged(self) -> bool:
+        if not self._active:
+            return False
+        for name, has_controller in self._expected().items():
+            entry = self._switches.get(name)
+            if entry is None:
+                return False
+            if has_controller and entry["tracked"] and not entry["connected"]:
+                return False
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            interval = self.poll_interval if self._active and not self.converged else IDLE_POLL_INTERVAL
+            self._wake.wait(interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.refresh()
+
+    def _ensure_monitor(self):
+        if self._monitor is not None and self._monitor.poll() is None:
+            return
+        try:
+            self._monitor = subprocess.Popen(
+                ["ovsdb-client", "monitor", "Open_vSwitch", "Controller", "is_connected", "--format=json"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except OSError:
+            self._monitor = None
+            return
+        self._monitor_thread = threading.Thread(
+            target=self._watch_monitor, args=(self._monitor,), name="ovsdb-monitor", daemon=True
+        )
+        self._monitor_thread.start()
+
+    def _watch_monitor(self, process: subprocess.Popen):
+        for _line in process.stdout:
+            self._wake.set()
+
+    def _stop_monitor(self):
+        process, self._monitor = self._monitor, None
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def expected_switches(switches: Iterable) -> Dict[str, bool]:
+    """Map started Mininet switches to whether they were given a controller.
+
+    Standalone switches (OVSBridge, or fail mode ``standalone``) forward on
+    their own and never wait for a controller, so they are not tracked.
+    """
+    return {
+        switch.name: bool(getattr(switch, "controller", None))
+        for switch in switches
+        if not isinstance(switch, OVSBridge) and getattr(switch, "failMode", None) != "standalone"
+    }
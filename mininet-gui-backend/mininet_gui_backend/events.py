@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import uuid
+from collections import deque
+from typing import Any, Deque, List, Optional, Set
+
+
+class TopologyEvents:
+    """Versioned feed of topology deltas.
+
+    Every published event gets the next revision number. The last
+    ``history_size`` events are kept so that clients reconnecting with a
+    recent revision can catch up without a full snapshot. Publishing is
+    thread-safe, since most handlers run in FastAPI's thread pool; delivery
+    to subscribers always happens on the event loop.
+
+    Revisions restart at zero with the process, so every event also carries
+    the ``epoch`` of the feed and a cursor from another epoch is never
+    resumed.
+    """
+
+    def __init__(self, history_size: int = 5000, queue_size: int = 1000):
+        self.epoch = uuid.uuid4().hex[:12]
+        self.revision = 0
+        self._history: Deque[dict] = deque(maxlen=history_size)
+        self._queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def publish(self, kind: str, op: str, id: Optional[str] = None, data: Any = None) -> dict:
+        with self._lock:
+            self.revision += 1
+            event = {"epoch": self.epoch, "rev": self.revision, "kind": kind, "op": op, "id": id, "data": data}
+            self._history.append(event)
+            # Scheduled under the lock: the loop runs callbacks in FIFO order,
+            # so subscribers receive events in revision order.
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(self._dispatch, event)
+        return event
+
+    def since(self, revision: int, epoch: Optional[str] = None) -> Optional[List[dict]]:
+        """Events after ``revision`` of ``epoch``, or None when a snapshot is needed.
+
+        That is the case for a cursor of another epoch, one ahead of the
+        feed, or one older than the history.
+        """
+        with self._lock:
+            if epoch != self.epoch or revision > self.revision:
+                return None
+            if revision == self.revision:
+                return []
+            if not self._history or self._history[0]["rev"] > revision + 1:
+                return None
+            return [event for event in self._history if event["rev"] > revision]
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _dispatch(self, event: dict):
+        for queue in list(self._subscribers):
+            if not queue.full():
+                queue.put_nowait(event)
+                continue
+            # The subscriber fell behind: drop its backlog and ask it to resync
+            # from a snapshot, events it already has are skipped by revision.
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"epoch": self.epoch, "rev": event["rev"], "kind": "resync", "op": "resync", "id": None, "data": None})
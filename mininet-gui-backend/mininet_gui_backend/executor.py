@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple, Union
+
+
+EXECUTOR_WORKERS = 16
+COMMAND_TIMEOUT = 30.0
+LATENCY_SAMPLES = 256
+
+NodeIds = Union[str, Iterable[str]]
+
+
+def _node_ids(nodes: NodeIds) -> Tuple[str, ...]:
+    return (nodes,) if isinstance(nodes, str) else tuple(dict.fromkeys(nodes))
+
+
+class _Job:
+    __slots__ = ("nodes", "fn", "args", "label", "future", "submitted", "arrived")
+
+    def __init__(self, nodes: Tuple[str, ...], fn: Callable, args: tuple, label: str):
+        self.nodes = nodes
+        self.fn = fn
+        self.args = args
+        self.label = label
+        self.future: Future = Future()
+        self.submitted = time.monotonic()
+        self.arrived = 0
+
+
+class _NodeMetrics:
+    __slots__ = ("completed", "failed", "timeouts", "wait", "run")
+
+    def __init__(self):
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.wait: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.run: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def as_dict(self, queued: int) -> dict:
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "queued": queued,
+            "wait_ms": _latency_summary(self.wait),
+            "run_ms": _latency_summary(self.run),
+        }
+
+
+def _latency_summary(samples: Iterable[float]) -> Optional[dict]:
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return {
+        "avg": round(1000 * sum(ordered) / len(ordered), 3),
+        "p50": round(1000 * ordered[len(ordered) // 2], 3),
+        "p95": round(1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(1000 * ordered[-1], 3),
+    }
+
+
+class NodeExecutor:
+    """Runs node operations in order per node and in parallel across nodes.
+
+    Every node has a FIFO of pending jobs and is scheduled on a shared pool
+    of ``workers`` threads one job at a time, so commands sent to a node's
+    shell never interleave, busy nodes take turns, and at most ``workers``
+    nodes run at once. A job may span several nodes (e.g. both ends of a
+    link); it is queued on all of them at once and runs when it reaches the
+    head of every queue, without holding a worker while it waits.
+
+    A caller that times out stops waiting: a job that has not started is
+    dropped and a running one is handed to ``interrupt`` per node, e.g. to
+    send Ctrl-C to its shell.
+    """
+
+    def __init__(
+        self,
+        workers: int = EXECUTOR_WORKERS,
+        timeout: float = COMMAND_TIMEOUT,
+        interrupt: Optional[Callable[[str], None]] = None,
+    ):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._interrupt = interrupt
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="node-exec")
+        self._queues: Dict[str, Deque[_Job]] = {}
+        self._metrics: Dict[str, _NodeMetrics] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, nodes: NodeIds, fn: Callable, *args, label: Optional[str] = None) -> Future:
+        node_ids = _node_ids(nodes)
+        if not node_ids:
+            raise ValueError("at least one node is required")
+        job = _Job(node_ids, fn, args, label or getattr(fn, "__name__", "job"))
+        with self._lock:
+            for node_id in node_ids:
+                queue = self._queues.setdefault(node_id, deque())
+                queue.append(job)
+                if len(queue) == 1:
+                    self._pool.submit(self._arrive, node_id)
+        return job.future
+
+    def run(self, nodes: NodeIds, fn: Callable, *args, timeout: Optional[float] = None, label: Optional[str] = None):
+        """Run ``fn(*args)`` in the queue of ``nodes`` and wait for its result."""
+        nodes = _node_ids(nodes)
+        future = self.submit(nodes, fn, *args, label=label)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            self._timed_out(nodes, future)
+            raise TimeoutError(f"{label or 'command'} on {', '.join(nodes)} timed out after {timeout:g}s")
+
+    async def run_async(
+        self, nodes: NodeIds, fn: Callable, *args, timeout: Optional[float] = None, label: Optional[str] = None
+    ):
+        """:meth:`run` without blocking the event loop."""
+        nodes = _node_ids(nodes)
+        future = self.submit(nodes, fn, *args, label=label)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            self._timed_out(nodes, future)
+            raise TimeoutError(f"{label or 'command'} on {', '.join(nodes)} timed out after {timeout:g}s")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            queued = {node_id: len(queue) for node_id, queue in self._queues.items()}
+            nodes = {
+                node_id: metrics.as_dict(queued.get(node_id, 0))
+                for node_id, metrics in self._metrics.items()
+            }
+        return {
+            "workers": self.workers,
+            "busy_nodes": len(queued),
+            "queued": sum(queued.values()),
+            "nodes": nodes,
+        }
+
+    def forget(self, node_id: str):
+        with self._lock:
+            self._metrics.pop(node_id, None)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _arrive(self, node_id: str):
+        # The job at the head of the queue of ``node_id`` has this node; run
+        # it once every node it spans has reached it.
+        with self._lock:
+            job = self._queues[node_id][0]
+            job.arrived += 1
+            if job.arrived < len(job.nodes):
+                return
+        self._execute(job)
+
+    def _execute(self, job: _Job):
+        started = time.monotonic()
+        failed = False
+        if job.future.set_running_or_notify_cancel():
+            try:
+                job.future.set_result(job.fn(*job.args))
+            except BaseException as exc:
+                failed = True
+                job.future.set_exception(exc)
+            finished = time.monotonic()
+            with self._lock:
+                for node_id in job.nodes:
+                    metrics = self._metrics.setdefault(node_id, _NodeMetrics())
+                    metrics.wait.append(started - job.submitted)
+                    metrics.run.append(finished - started)
+                    if failed:
+                        metrics.failed += 1
+                    else:
+                        metrics.completed += 1
+        with self._lock:
+            for node_id in job.nodes:
+                queue = self._queues[node_id]
+                queue.popleft()
+                if queue:
+                    self._pool.submit(self._arrive, node_id)
+                else:
+                    del self._queues[node_id]
+
+    def _timed_out(self, node_ids: Tuple[str, ...], future: Future):
+        with self._lock:
+            for node_id in node_ids:
+                self._metrics.setdefault(node_id, _NodeMetrics()).timeouts += 1
+        if future.cancel() or future.done() or self._interrupt is None:
+            return
+        for node_id in node_ids:
+            try:
+                self._interrupt(node_id)
+            except Exception:
+                pass
@@ -1,11 +1,16 @@
 import json
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Tuple, Union
+from typing import Dict, Hashable, List, Optional, Tuple
 
 from mininet.node import Node
 
 from mininet_gui_backend.schema import Host, Switch, Controller, Nat, Router
-from mininet_gui_backend.utils import parse_ip_addrs
+from mininet_gui_backend.parsing import parse_ip_json_addrs
+from mininet_gui_backend.utils import namespace_command
 
 
 SCRIPT_TEMPLATE = """
@@ -96,15 +101,12 @@ class Ryu(Node):
         self.checkListening()
 
     def checkListening(self):
-        out, _err, returnCode = errRun("which telnet")
-        if "telnet" not in out or returnCode != 0:
-            raise Exception("Error running telnet to check for listening controllers; please check that it is installed.")
-        listening = self.cmd("echo A | telnet -e A %s %d" % (self.ip, self.port))
-        if "Connected" in listening:
-            servers = self.cmd("netstat -natp").split("\\n")
-            pstr = ":%d " % self.port
-            clist = servers[0:1] + [s for s in servers if pstr in s]
-            raise Exception("Please shut down the controller which is running on port %d:\\n" % self.port + "\\n".join(clist))
+        import socket
+        try:
+            socket.create_connection((self.ip, self.port), timeout=0.5).close()
+        except OSError:
+            return
+        raise Exception("Please shut down the controller which is running on %s:%d" % (self.ip, self.port))
 
     def start(self):
         pathCheck("ryu")
@@ -226,31 +228,53 @@ def export_net_to_json(
     return json.dumps(net_data, indent=4)
 
 
-def build_addressing_plan(net: "Mininet") -> dict:
+ADDRESSING_PLAN_TTL = 10.0
+ADDRESSING_PLAN_WORKERS = 16
+
+
+def read_namespace_addrs(pid: Optional[int]) -> Dict[str, dict]:
+    """Addresses of every interface in the network namespace of ``pid`` (None for the root one)."""
+    try:
+        result = subprocess.run(
+            namespace_command(pid, ["ip", "-json", "addr", "show"]),
+            text=True,
+            capture_output=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    return parse_ip_json_addrs(result.stdout)
+
+
+def build_addressing_plan(net: "Mininet", workers: int = ADDRESSING_PLAN_WORKERS) -> dict:
+    # Nodes outside a namespace (switches, most controllers) all see the root
+    # namespace, so one ``ip -json addr`` per namespace covers every node.
+    namespaces: Dict[Optional[int], None] = {}
+    for node in net.nameToNode.values():
+        if getattr(node, "type", None):
+            namespaces[node.pid if getattr(node, "inNamespace", False) else None] = None
+    addrs: Dict[Optional[int], Dict[str, dict]] = {}
+    if namespaces:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(namespaces)))) as pool:
+            addrs = dict(zip(namespaces, pool.map(read_namespace_addrs, namespaces)))
+
     nodes = []
     for node_id, node in net.nameToNode.items():
         node_type = getattr(node, "type", None)
         if not node_type:
             continue
+        namespace = addrs.get(node.pid if getattr(node, "inNamespace", False) else None, {})
         intfs = []
         for intf in node.intfList():
             if not intf.name or intf.name in ("lo", "lo0"):
                 continue
-            ipv4_out, _, _ = node.pexec(f"ip -o -4 addr show {intf.name}")
-            ipv6_out, _, _ = node.pexec(f"ip -o -6 addr show {intf.name}")
-            ipv4 = parse_ip_addrs(ipv4_out)
-            ipv6 = parse_ip_addrs(ipv6_out)
-            mac = None
-            try:
-                mac = intf.MAC()
-            except Exception:
-                pass
+            info = namespace.get(intf.name, {})
             intfs.append(
                 {
                     "name": intf.name,
-                    "mac": mac,
-                    "ipv4": ipv4,
-                    "ipv6": ipv6,
+                    "mac": info.get("mac") or getattr(intf, "mac", None),
+                    "ipv4": info.get("ipv4", []),
+                    "ipv6": info.get("ipv6", []),
                 }
             )
         nodes.append(
@@ -264,3 +288,31 @@ def build_addressing_plan(net: "Mininet") -> dict:
         "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
         "nodes": nodes,
     }
+
+
+class AddressingPlanCache:
+    """Reuses the last addressing plan while the topology revision is unchanged.
+
+    Addresses changed by hand inside a node are not part of the revision, so
+    a cached plan is also rebuilt once it is older than ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float = ADDRESSING_PLAN_TTL):
+        self.ttl = ttl
+        self._plan: Optional[dict] = None
+        self._revision: Optional[Hashable] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, net: "Mininet", revision: Hashable, refresh: bool = False) -> dict:
+        with self._lock:
+            fresh = time.monotonic() - self._built_at < self.ttl
+            if refresh or self._plan is None or revision != self._revision or not fresh:
+                self._plan = build_addressing_plan(net)
+                self._revision = revision
+                self._built_at = time.monotonic()
+            return self._plan
+
+    def invalidate(self):
+        with self._lock:
+            self._plan = None
@@ -0,0 +1,158 @@
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# Marks flows owned by the forwarding engine so user flows are left alone.
+PROACTIVE_COOKIE = 0x4D475046
+UNICAST_PRIORITY = 100
+FLOOD_BLOCK_PRIORITY = 95
+FLOOD_PRIORITY = 90
+MULTICAST_MATCH = "dl_dst=01:00:00:00:00:00/01:00:00:00:00:00"
+INSTALL_CONCURRENCY = 32
+INSTALL_TIMEOUT = 10.0
+
+# One end of a link: (node name, interface name, OpenFlow port or None, MAC or None).
+LinkEnd = Tuple[str, str, Optional[int], Optional[str]]
+# Flow table of one switch: "priority=...,<match>" -> actions.
+FlowTable = Dict[str, str]
+
+
+def port_ref(end: LinkEnd) -> str:
+    return str(end[2]) if end[2] is not None else f'"{end[1]}"'
+
+
+def plan_l2_flows(switches: Set[str], links: List[Tuple[LinkEnd, LinkEnd]]) -> Dict[str, FlowTable]:
+    """Shortest-path unicast and loop-free flooding flows for ``switches``.
+
+    Links between two of ``switches`` form the switch graph; links from
+    one of them to a node with a MAC are edge ports, and that MAC is a
+    destination. Every destination gets one exact ``dl_dst`` flow per
+    switch along a BFS tree rooted at its switch, so unicast follows
+    shortest paths. Broadcast and multicast are flooded on
+    a spanning tree of each connected component plus the edge ports, and
+    dropped when they arrive on an inter-switch port outside the tree.
+    Links to switches outside ``switches`` (e.g. ones with a controller)
+    must be passed without a MAC and are ignored.
+    """
+    trunks: Dict[str, Dict[str, str]] = {switch: {} for switch in switches}
+    edges: Dict[str, List[str]] = {switch: [] for switch in switches}
+    hosts: Dict[str, Tuple[str, str]] = {}
+    for a, b in links:
+        for near, far in ((a, b), (b, a)):
+            if near[0] not in switches:
+                continue
+            if far[0] in switches:
+                trunks[near[0]].setdefault(far[0], port_ref(near))
+            elif far[3]:
+                edges[near[0]].append(port_ref(near))
+                hosts[far[3].lower()] = (near[0], port_ref(near))
+    neighbors = {switch: sorted(peers) for switch, peers in trunks.items()}
+
+    tables: Dict[str, FlowTable] = {switch: {} for switch in switches}
+    for mac, (home, port) in sorted(hosts.items()):
+        tables[home][f"priority={UNICAST_PRIORITY},dl_dst={mac}"] = f"output:{port}"
+        seen = {home}
+        queue = deque([home])
+        while queue:
+            switch = queue.popleft()
+            for peer in neighbors[switch]:
+                if peer not in seen:
+                    seen.add(peer)
+                    tables[peer][f"priority={UNICAST_PRIORITY},dl_dst={mac}"] = f"output:{trunks[peer][switch]}"
+                    queue.append(peer)
+
+    tree: Dict[str, Set[str]] = {switch: set() for switch in switches}
+    visited: Set[str] = set()
+    for root in sorted(switches):
+        if root in visited:
+            continue
+        visited.add(root)
+        queue = deque([root])
+        while queue:
+            switch = queue.popleft()
+            for peer in neighbors[switch]:
+                if peer not in visited:
+                    visited.add(peer)
+                    tree[switch].add(peer)
+                    tree[peer].add(switch)
+                    queue.append(peer)
+    for switch in switches:
+        flood = [trunks[switch][peer] for peer in sorted(tree[switch])] + sorted(set(edges[switch]))
+        if flood:
+            tables[switch][f"priority={FLOOD_PRIORITY},{MULTICAST_MATCH}"] = ",".join(f"output:{port}" for port in flood)
+        for peer in neighbors[switch]:
+            if peer not in tree[switch]:
+                match = f"priority={FLOOD_BLOCK_PRIORITY},in_port={trunks[switch][peer]},{MULTICAST_MATCH}"
+                tables[switch][match] = "drop"
+    return tables
+
+
+def flow_table_commands(installed: Optional[FlowTable], table: FlowTable) -> List[str]:
+    """``ovs-ofctl add-flows`` lines turning ``installed`` into ``table``.
+
+    Without a known installed table every engine flow is deleted first.
+    An ``add`` of an existing match replaces its actions, so only removed
+    matches need a delete.
+    """
+    commands = []
+    if installed is None:
+        commands.append(f"delete cookie={PROACTIVE_COOKIE:#x}/-1")
+        installed = {}
+    commands.extend(
+        f"delete_strict cookie={PROACTIVE_COOKIE:#x}/-1,{match}" for match in sorted(installed) if match not in table
+    )
+    commands.extend(
+        f"add cookie={PROACTIVE_COOKIE:#x},{match},actions={actions}"
+        for match, actions in sorted(table.items())
+        if installed.get(match) != actions
+    )
+    return commands
+
+
+async def install_flow_commands(
+    switch: str, commands: List[str], of_version: Optional[str] = None, timeout: float = INSTALL_TIMEOUT
+) -> Optional[str]:
+    """Run ``commands`` in a single ``ovs-ofctl add-flows``; returns the error, if any."""
+    if not commands:
+        return None
+    cmd = ["ovs-ofctl"]
+    if of_version:
+        cmd.extend(["-O", of_version])
+    cmd.extend(["add-flows", switch, "-"])
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+    except OSError as exc:
+        return str(exc)
+    try:
+        output, _ = await asyncio.wait_for(process.communicate("".join(f"{c}\n" for c in commands).encode()), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return "ovs-ofctl add-flows timed out"
+    except asyncio.CancelledError:
+        process.kill()
+        raise
+    if process.returncode != 0:
+        return output.decode(errors="ignore").strip() or "ovs-ofctl add-flows failed"
+    return None
+
+
+async def install_flow_tables(
+    targets: Dict[str, Tuple[List[str], Optional[str]]],
+    concurrency: int = INSTALL_CONCURRENCY,
+) -> Dict[str, Optional[str]]:
+    """:func:`install_flow_commands` for many switches at once, keyed by switch name."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def install(switch: str, commands: List[str], of_version: Optional[str]) -> Optional[str]:
+        async with semaphore:
+            return await install_flow_commands(switch, commands, of_version)
+
+    errors = await asyncio.gather(*(install(switch, *target) for switch, target in targets.items()))
+    return dict(zip(targets, errors))
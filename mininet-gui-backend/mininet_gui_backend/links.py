@@ -0,0 +1,139 @@
+import json
+import uuid
+from typing import Dict, List, Optional, Set
+
+from mininet.link import Link
+
+
+def link_key(src: str, dst: str) -> frozenset:
+    return frozenset((src, dst))
+
+
+class LinkStore:
+    """Topology links with per-node adjacency and cached edge payloads.
+
+    ``links`` maps ``frozenset((src, dst))`` to the Mininet ``Link`` and
+    ``attrs`` maps the same keys to the user supplied link options; both are
+    exposed as ``app.links`` and ``app.link_attrs`` and must only be mutated
+    through the store. Every mutation bumps ``revision`` and drops the cached
+    payload of the affected edge, so serializing an unchanged topology is free.
+    The ETag also carries a per-process ``epoch``, since revisions restart
+    with the backend.
+    """
+
+    def __init__(self):
+        self.links: Dict[frozenset, Link] = {}
+        self.attrs: Dict[frozenset, dict] = {}
+        self.epoch = uuid.uuid4().hex[:12]
+        self.revision = 0
+        self._adjacency: Dict[str, Set[frozenset]] = {}
+        self._payloads: Dict[frozenset, dict] = {}
+        self._edges_json: Optional[bytes] = None
+
+    def __contains__(self, key: frozenset) -> bool:
+        return key in self.attrs
+
+    def __len__(self) -> int:
+        return len(self.attrs)
+
+    @property
+    def etag(self) -> str:
+        return f'W/"links-{self.epoch}-{self.revision}"'
+
+    def add(self, src: str, dst: str, link: Optional[Link], attrs: Optional[dict] = None) -> frozenset:
+        key = link_key(src, dst)
+        self.attrs[key] = attrs or {}
+        if link is not None:
+            self.links[key] = link
+        for node_id in key:
+            self._adjacency.setdefault(node_id, set()).add(key)
+        self._changed(key)
+        return key
+
+    def set_link(self, key: frozenset, link: Link):
+        self.links[key] = link
+        self._changed(key)
+
+    def set_attrs(self, key: frozenset, attrs: dict):
+        self.attrs[key] = attrs
+        self._changed(key)
+
+    def get(self, src: str, dst: str) -> Optional[Link]:
+        return self.links.get(link_key(src, dst))
+
+    def remove(self, key: frozenset) -> Optional[Link]:
+        link = self.links.pop(key, None)
+        self.attrs.pop(key, None)
+        for node_id in key:
+            keys = self._adjacency.get(node_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._adjacency[node_id]
+        self._changed(key)
+        return link
+
+    def node_links(self, node_id: str) -> List[frozenset]:
+        return list(self._adjacency.get(node_id, ()))
+
+    def neighbors(self, node_id: str) -> Set[str]:
+        neighbors = set()
+        for key in self._adjacency.get(node_id, ()):
+            neighbors.update(key)
+        neighbors.discard(node_id)
+        return neighbors
+
+    def detach(self):
+        """Forget the Mininet link objects, keeping attrs and adjacency for a rebuild."""
+        self.links.clear()
+        self._payloads.clear()
+        self._edges_json = None
+        self.revision += 1
+
+    def clear(self):
+        self.links.clear()
+        self.attrs.clear()
+        self._adjacency.clear()
+        self._payloads.clear()
+        self._edges_json = None
+        self.revision += 1
+
+    def edge(self, key: frozenset) -> Optional[dict]:
+        payload = self._payloads.get(key)
+        if payload is None and key in self.links:
+            payload = self._build_edge(key)
+            if payload is not None:
+                self._payloads[key] = payload
+        return payload
+
+    def edges(self) -> List[dict]:
+        # Handlers mutate the store from worker threads; list() copies the
+        # keys in one step, so a concurrent add or remove cannot break the
+        # iteration.
+        return [edge for edge in map(self.edge, list(self.links)) if edge is not None]
+
+    def edges_json(self) -> bytes:
+        if self._edges_json is None:
+            self._edges_json = json.dumps(self.edges()).encode("utf-8")
+        return self._edges_json
+
+    def _changed(self, key: frozenset):
+        self._payloads.pop(key, None)
+        self._edges_json = None
+        self.revision += 1
+
+    def _build_edge(self, key: frozenset) -> Optional[dict]:
+        nodes = list(key)
+        link = self.links.get(key)
+        from_node = nodes[0] if len(nodes) > 0 else None
+        to_node = nodes[1] if len(nodes) > 1 else None
+        intfs = None
+        intf1 = getattr(link, "intf1", None)
+        intf2 = getattr(link, "intf2", None)
+        if intf1 and intf2 and getattr(intf1, "node", None) and getattr(intf2, "node", None):
+            from_node = intf1.node.name
+            to_node = intf2.node.name
+            intfs = {"from": intf1.name, "to": intf2.name}
+        if not from_node or not to_node:
+            return None
+        return {"from": from_node, "to": to_node, "options": self.attrs.get(key) or {}, "intfs": intfs}
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import logging.handlers
+import queue
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+
+class LogSubscription:
+    def __init__(self, level: int, logger: Optional[str], maxsize: int):
+        self.level = level
+        self.logger = logger
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def accepts(self, entry: dict) -> bool:
+        if entry["levelno"] < self.level:
+            return False
+        if self.logger:
+            name = entry["logger"]
+            return name == self.logger or name.startswith(self.logger + ".")
+        return True
+
+
+class LogBus(logging.Handler):
+    """Logging handler that keeps recent records in memory and streams them.
+
+    Formatted records go into a bounded ring buffer and are pushed to
+    WebSocket subscribers, each with its own level and logger filter. Records
+    may be emitted from any thread; delivery happens on the event loop.
+    """
+
+    def __init__(self, capacity: int = 5000, queue_size: int = 5000):
+        super().__init__(level=logging.DEBUG)
+        self._history: Deque[dict] = deque(maxlen=capacity)
+        self._queue_size = queue_size
+        self._subscribers: Dict[int, LogSubscription] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            entry = {
+                "levelno": record.levelno,
+                "logger": record.name,
+                "line": self.format(record).rstrip("\n"),
+            }
+        except Exception:
+            self.handleError(record)
+            return
+        self._history.append(entry)
+        loop = self._loop
+        if loop is not None and self._subscribers and not loop.is_closed():
+            loop.call_soon_threadsafe(self._dispatch, entry)
+
+    def clear(self):
+        self._history.clear()
+
+    def history(self, level: int = logging.NOTSET, logger: Optional[str] = None, limit: int = 1000) -> List[str]:
+        probe = LogSubscription(level, logger, 1)
+        lines = [entry["line"] for entry in list(self._history) if probe.accepts(entry)]
+        return lines[-limit:] if limit else lines
+
+    def subscribe(self, level: int = logging.NOTSET, logger: Optional[str] = None) -> LogSubscription:
+        subscription = LogSubscription(level, logger, self._queue_size)
+        self._subscribers[id(subscription)] = subscription
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription):
+        self._subscribers.pop(id(subscription), None)
+
+    async def next_batch(self, subscription: LogSubscription, max_lines: int = 500, linger: float = 0.05) -> List[str]:
+        """Wait for at least one line, then collect whatever arrives within ``linger`` seconds."""
+        lines = [await subscription.queue.get()]
+        if linger:
+            await asyncio.sleep(linger)
+        while len(lines) < max_lines and not subscription.queue.empty():
+            lines.append(subscription.queue.get_nowait())
+        if subscription.dropped:
+            lines.append(f"... {subscription.dropped} log lines dropped (client too slow)")
+            subscription.dropped = 0
+        return lines
+
+    def _dispatch(self, entry: dict):
+        for subscription in list(self._subscribers.values()):
+            if not subscription.accepts(entry):
+                continue
+            if subscription.queue.full():
+                subscription.dropped += 1
+            else:
+                subscription.queue.put_nowait(entry["line"])
+
+
+def parse_level(value: Optional[str]) -> int:
+    if not value:
+        return logging.NOTSET
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value.upper())
+    return level if isinstance(level, int) else logging.NOTSET
+
+
+class LazyMessage:
+    """Log message whose arguments are only joined when a handler formats it."""
+
+    __slots__ = ("msg", "args")
+
+    def __init__(self, msg, args: tuple = ()):
+        self.msg = msg
+        self.args = args
+
+    def __str__(self) -> str:
+        return " ".join(map(str, (self.msg, *self.args)))
+
+
+class _PipelineHandler(logging.handlers.QueueHandler):
+    def __init__(self, queue, pipeline: "LogPipeline"):
+        super().__init__(queue)
+        self._pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock QueueHandler formats on the calling thread so the record
+        # can be pickled; records never leave the process here, so
+        # formatting is left to the writer thread.
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self._pipeline.enqueued += 1
+        except queue.Full:
+            self._pipeline.dropped += 1
+
+
+class LogPipeline:
+    """Moves log I/O off the calling thread.
+
+    Loggers get a single queue handler; a background ``QueueListener`` thread
+    formats the records and hands them to the real handlers (log file, log
+    bus). Messages are formatted on that thread, so objects passed as log
+    arguments are rendered in the state they have when the record is written.
+    When the queue is full, records are dropped and counted rather than
+    blocking the request.
+    """
+
+    def __init__(self, queue_size: int = 100000, level: int = logging.DEBUG):
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = _PipelineHandler(self._queue, self)
+        self.handler.setLevel(level)
+        self.enqueued = 0
+        self.dropped = 0
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
+    @property
+    def level(self) -> int:
+        return self.handler.level
+
+    def set_level(self, level: int):
+        self.handler.setLevel(level)
+
+    def enabled_for(self, level: int) -> bool:
+        return level >= self.handler.level
+
+    def start(self, loggers: List[logging.Logger], handlers: List[logging.Handler]):
+        self.stop()
+        for logger in loggers:
+            if self.handler not in logger.handlers:
+                logger.addHandler(self.handler)
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+
+    def stop(self):
+        """Stop the writer thread after it has written every queued record."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {
+            "level": logging.getLevelName(self.level),
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "running": self._listener is not None,
+        }
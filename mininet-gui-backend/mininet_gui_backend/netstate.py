@@ -0,0 +1,87 @@
+import asyncio
+import subprocess
+from typing import Dict, Optional
+
+from mininet_gui_backend.parsing import link_from_json, neighbor_from_json, parse_json_stream, route_from_json
+from mininet_gui_backend.utils import namespace_command
+
+
+NETSTATE_TIMEOUT = 5.0
+NETSTATE_CONCURRENCY = 32
+
+# Read in one ``ip -json -batch`` run, in this order.
+NETSTATE_QUERIES = ("neigh show", "route show", "link show")
+NETSTATE_COMMAND = ["ip", "-json", "-force", "-batch", "-"]
+NETSTATE_INPUT = "".join(f"{query}\n" for query in NETSTATE_QUERIES)
+
+
+def parse_netstate(output: str, stderr: str = "") -> dict:
+    """Neighbours, routes and links from the output of :data:`NETSTATE_COMMAND`."""
+    state = {"neighbors": [], "routes": [], "links": [], "error": None}
+    try:
+        documents = parse_json_stream(output)
+    except ValueError as exc:
+        state["error"] = f"unreadable ip output: {exc}"
+        return state
+    if len(documents) != len(NETSTATE_QUERIES):
+        # A failing query prints nothing, so the arrays can no longer be told apart.
+        state["error"] = (stderr or "ip -batch returned an incomplete answer").strip()
+        return state
+    neighbors, routes, links = documents
+    state["neighbors"] = [neighbor_from_json(entry) for entry in neighbors if entry.get("dst")]
+    state["routes"] = [route_from_json(entry) for entry in routes if entry.get("dst")]
+    state["links"] = [link_from_json(entry) for entry in links if entry.get("ifname")]
+    return state
+
+
+def read_netstate(pid: Optional[int], timeout: float = NETSTATE_TIMEOUT) -> dict:
+    """Neighbour table, routes and link state of the namespace of ``pid`` in one round-trip."""
+    try:
+        result = subprocess.run(
+            namespace_command(pid, NETSTATE_COMMAND),
+            input=NETSTATE_INPUT,
+            text=True,
+            capture_output=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        return parse_netstate("", str(exc))
+    return parse_netstate(result.stdout, result.stderr)
+
+
+async def async_read_netstate(pid: Optional[int], timeout: float = NETSTATE_TIMEOUT) -> dict:
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *namespace_command(pid, NETSTATE_COMMAND),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as exc:
+        return parse_netstate("", str(exc))
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(NETSTATE_INPUT.encode()), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return parse_netstate("", "ip -batch timed out")
+    except asyncio.CancelledError:
+        process.kill()
+        raise
+    return parse_netstate(stdout.decode(errors="ignore"), stderr.decode(errors="ignore"))
+
+
+async def read_netstates(
+    pids: Dict[str, Optional[int]],
+    concurrency: int = NETSTATE_CONCURRENCY,
+    timeout: float = NETSTATE_TIMEOUT,
+) -> Dict[str, dict]:
+    """:func:`async_read_netstate` for many nodes at once, keyed by node name."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def read(pid: Optional[int]) -> dict:
+        async with semaphore:
+            return await async_read_netstate(pid, timeout)
+
+    states = await asyncio.gather(*(read(pid) for pid in pids.values()))
+    return dict(zip(pids, states))
@@ -1,8 +1,36 @@
+import asyncio
+import socket
+
 from mininet.node import Node
-from mininet.util import errRun
 from mininet.moduledeps import pathCheck
 
 
+RYU_READY_TIMEOUT = 10.0
+RYU_READY_INTERVAL = 0.1
+
+
+def probe_port(ip: str, port: int, timeout: float = 0.5) -> bool:
+    """True when something accepts TCP connections on ip:port."""
+    try:
+        with socket.create_connection((ip, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+async def async_probe_port(ip: str, port: int, timeout: float = 0.5) -> bool:
+    try:
+        _reader, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
 class Ryu(Node):
     """Ryu controller node."""
 
@@ -29,22 +57,24 @@ class Ryu(Node):
         self.checkListening()
 
     def checkListening(self):
-        out, _err, returnCode = errRun("which telnet")
-        if "telnet" not in out or returnCode != 0:
+        # The node shares the root namespace, so probing from here is
+        # equivalent to probing from its shell.
+        if probe_port(self.ip, self.port):
             raise Exception(
-                "Error running telnet to check for listening controllers; please check that it is installed."
-            )
-        listening = self.cmd("echo A | telnet -e A %s %d" % (self.ip, self.port))
-        if "Connected" in listening:
-            servers = self.cmd("netstat -natp").split("\n")
-            pstr = ":%d " % self.port
-            clist = servers[0:1] + [s for s in servers if pstr in s]
-            raise Exception(
-                "Please shut down the controller which is running on port %d:\n"
-                % self.port
-                + "\n".join(clist)
+                "Please shut down the controller which is running on %s:%d" % (self.ip, self.port)
             )
 
+    async def waitReady(self, timeout=RYU_READY_TIMEOUT, interval=RYU_READY_INTERVAL):
+        """Wait until ryu accepts OpenFlow connections; False on timeout."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            if await async_probe_port(self.ip, self.port, timeout=interval):
+                return True
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+
     def start(self):
         pathCheck("ryu")
         cout = "/tmp/" + self.name + ".log"
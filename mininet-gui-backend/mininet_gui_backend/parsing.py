@@ -0,0 +1,196 @@
+import json
+from typing import Dict, List, Optional, TypedDict
+
+
+# Flow dump keys that are flow statistics rather than match fields.
+FLOW_STAT_FIELDS = frozenset(
+    ("cookie", "duration", "table", "n_packets", "n_bytes", "idle_timeout", "priority", "actions")
+)
+# Keys dropped when turning a dumped flow back into a del-flows match.
+FLOW_COUNTER_FIELDS = frozenset(("duration", "n_packets", "n_bytes", "idle_timeout", "hard_timeout"))
+
+
+class Route(TypedDict):
+    dst: str
+    via: Optional[str]
+    dev: Optional[str]
+    proto: Optional[str]
+    scope: Optional[str]
+    src: Optional[str]
+    metric: Optional[int]
+
+
+class Neighbor(TypedDict):
+    ip: str
+    mac: Optional[str]
+    interface: Optional[str]
+    state: List[str]
+
+
+class Link(TypedDict):
+    name: str
+    mac: Optional[str]
+    state: Optional[str]
+    mtu: Optional[int]
+    flags: List[str]
+
+
+class FlowRecord(TypedDict, total=False):
+    """A dumped flow: statistics keys (cookie, table, ...), ``actions`` and ``match_fields``."""
+
+    actions: str
+    match_fields: Dict[str, object]
+
+
+def parse_ip_json_addrs(output: str) -> Dict[str, dict]:
+    """Interfaces from ``ip -json addr show``, keyed by name, with MAC and v4/v6 CIDRs."""
+    try:
+        links = json.loads(output or "[]")
+    except ValueError:
+        return {}
+    intfs = {}
+    for link in links:
+        name = link.get("ifname")
+        if not name:
+            continue
+        addrs = {"inet": [], "inet6": []}
+        for addr in link.get("addr_info", []):
+            family = addr.get("family")
+            if family in addrs and addr.get("local") is not None:
+                addrs[family].append(f"{addr['local']}/{addr.get('prefixlen')}")
+        intfs[name] = {"mac": link.get("address"), "ipv4": addrs["inet"], "ipv6": addrs["inet6"]}
+    return intfs
+
+
+def parse_json_stream(output: str) -> list:
+    """Every JSON document of ``output``, e.g. one array per command of ``ip -json -batch``."""
+    decoder = json.JSONDecoder()
+    documents = []
+    index = 0
+    while True:
+        while index < len(output) and output[index].isspace():
+            index += 1
+        if index >= len(output):
+            return documents
+        document, index = decoder.raw_decode(output, index)
+        documents.append(document)
+
+
+def neighbor_from_json(entry: dict) -> Neighbor:
+    """One entry of ``ip -json neigh show``."""
+    return {
+        "ip": entry.get("dst"),
+        "mac": entry.get("lladdr"),
+        "interface": entry.get("dev"),
+        "state": entry.get("state", []),
+    }
+
+
+def route_from_json(entry: dict) -> Route:
+    """One entry of ``ip -json route show`` as a :class:`Route`."""
+    return {
+        "dst": entry.get("dst"),
+        "via": entry.get("gateway"),
+        "dev": entry.get("dev"),
+        "proto": entry.get("protocol"),
+        "scope": entry.get("scope"),
+        "src": entry.get("prefsrc"),
+        "metric": entry.get("metric"),
+    }
+
+
+def link_from_json(entry: dict) -> Link:
+    """One entry of ``ip -json link show``."""
+    return {
+        "name": entry.get("ifname"),
+        "mac": entry.get("address"),
+        "state": entry.get("operstate"),
+        "mtu": entry.get("mtu"),
+        "flags": entry.get("flags", []),
+    }
+
+
+def format_route(route: Route) -> str:
+    """Render a route the way ``ip route show`` prints it."""
+    parts = [route["dst"]]
+    for key in ("via", "dev", "proto", "scope", "src", "metric"):
+        if route.get(key) is not None:
+            parts.extend((key, str(route[key])))
+    return " ".join(parts)
+
+
+def parse_flow(line: str) -> Optional[FlowRecord]:
+    """One line of ``ovs-ofctl dump-flows``, split into statistics, match fields and actions."""
+    line = line.strip()
+    if not line:
+        return None
+    head, sep, actions = line.partition(" actions=")
+    if not sep:
+        head, sep, actions = line.partition("actions=")
+    flow: FlowRecord = {}
+    if sep:
+        flow["actions"] = actions.strip()
+    match: Dict[str, object] = {}
+    stat_fields = FLOW_STAT_FIELDS
+    for field in head.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        key, eq, value = field.partition("=")
+        if not eq:
+            match[field] = True
+        elif key in stat_fields:
+            flow[key] = value
+        else:
+            match[key] = value
+    flow["match_fields"] = match
+    return flow
+
+
+def parse_flow_dump(output: str) -> List[FlowRecord]:
+    flows = []
+    for line in output.splitlines():
+        flow = parse_flow(line)
+        if flow is not None:
+            flows.append(flow)
+    return flows
+
+
+def parse_port_stats(output: str) -> List[str]:
+    """Per-port blocks of ``ovs-ofctl dump-ports``, without the LOCAL port."""
+    body = output[output.find("\n") + 1:].replace("\n", " ")
+    return [part.strip() for part in body.split("port") if "LOCAL" not in part and part.strip()]
+
+
+def parse_flow_match_from_dump(line: str) -> str:
+    """Turn a dumped flow into a strict del-flows match."""
+    line = line.strip()
+    if "actions=" not in line:
+        raise ValueError("flow line missing actions")
+    head = line.split(" actions=", 1)[0].strip()
+    match_parts = []
+    cookie_value = table_value = priority_value = None
+    for part in head.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, _eq, value = part.partition("=")
+        if key == "cookie":
+            cookie_value = value
+        elif key == "table":
+            table_value = value
+        elif key == "priority":
+            priority_value = value
+        elif key not in FLOW_COUNTER_FIELDS:
+            match_parts.append(part)
+    if cookie_value:
+        if "/" not in cookie_value:
+            cookie_value = f"{cookie_value}/-1"
+        match_parts.insert(0, f"cookie={cookie_value}")
+    if table_value is not None:
+        match_parts.insert(0, f"table={table_value}")
+    if priority_value is not None:
+        match_parts.insert(0, f"priority={priority_value}")
+    if not match_parts:
+        raise ValueError("could not build match")
+    return ",".join(match_parts)
@@ -0,0 +1,198 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from pydantic import BaseModel
+
+from mininet_gui_backend.registry import NODE_KINDS
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS links (
+    key TEXT PRIMARY KEY,
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    options TEXT NOT NULL
+);
+"""
+
+
+def link_key(src: str, dst: str) -> str:
+    return "\n".join(sorted((src, dst)))
+
+
+class TopologyStore:
+    """Write-behind SQLite store for the in-memory topology.
+
+    Mutations are recorded in a pending map keyed by node id or link key, so
+    repeated updates of the same object (e.g. dragging a node) collapse into a
+    single row write. A background thread flushes the pending map in one WAL
+    transaction once no new mutation has arrived for ``debounce`` seconds, or
+    after ``max_delay`` seconds of continuous updates.
+    """
+
+    def __init__(self, path: str, debounce: float = 0.5, max_delay: float = 2.0):
+        self.path = path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending_nodes: Dict[str, Optional[Tuple[str, str]]] = {}
+        self._pending_links: Dict[str, Optional[Tuple[str, str, str]]] = {}
+        self._clear_pending = False
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def open(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="topology-store", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def load(self) -> dict:
+        data = {kind: [] for kind in NODE_KINDS}
+        data["links"] = []
+        if not self._conn:
+            return data
+        for kind, raw in self._conn.execute("SELECT kind, data FROM nodes ORDER BY rowid"):
+            if kind in data:
+                data[kind].append(json.loads(raw))
+        for src, dst, options in self._conn.execute("SELECT src, dst, options FROM links ORDER BY rowid"):
+            data["links"].append((src, dst, json.loads(options)))
+        return data
+
+    def save_node(self, kind: str, node: BaseModel):
+        self._mark_node(node.id, (kind, node.model_dump_json()))
+
+    def save_nodes(self, kind: str, nodes: Iterable[BaseModel]):
+        with self._cond:
+            for node in nodes:
+                self._pending_nodes[node.id] = (kind, node.model_dump_json())
+            self._cond.notify()
+
+    def delete_node(self, node_id: str):
+        self._mark_node(node_id, None)
+
+    def save_link(self, src: str, dst: str, options: Optional[dict]):
+        self._mark_link(link_key(src, dst), (src, dst, json.dumps(options or {})))
+
+    def delete_link(self, src: str, dst: str):
+        self._mark_link(link_key(src, dst), None)
+
+    def clear(self):
+        with self._cond:
+            self._pending_nodes.clear()
+            self._pending_links.clear()
+            self._clear_pending = True
+            self._cond.notify()
+
+    def flush(self):
+        with self._write_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._cond:
+            nodes, self._pending_nodes = self._pending_nodes, {}
+            links, self._pending_links = self._pending_links, {}
+            clear, self._clear_pending = self._clear_pending, False
+        if not (nodes or links or clear) or not self._conn:
+            return
+        conn = self._conn
+        conn.execute("BEGIN")
+        try:
+            if clear:
+                conn.execute("DELETE FROM nodes")
+                conn.execute("DELETE FROM links")
+            conn.executemany(
+                "INSERT OR REPLACE INTO nodes (id, kind, data) VALUES (?, ?, ?)",
+                [(node_id, value[0], value[1]) for node_id, value in nodes.items() if value is not None],
+            )
+            conn.executemany(
+                "DELETE FROM nodes WHERE id = ?",
+                [(node_id,) for node_id, value in nodes.items() if value is None],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO links (key, src, dst, options) VALUES (?, ?, ?, ?)",
+                [(key,) + value for key, value in links.items() if value is not None],
+            )
+            conn.executemany(
+                "DELETE FROM links WHERE key = ?",
+                [(key,) for key, value in links.items() if value is None],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            self._requeue(nodes, links, clear)
+            raise
+
+    def _requeue(self, nodes: dict, links: dict, clear: bool):
+        """Put a failed batch back, unless newer writes superseded it."""
+        with self._cond:
+            if self._clear_pending:
+                # A clear() arrived meanwhile; the batch is obsolete.
+                return
+            self._clear_pending = clear
+            for node_id, value in nodes.items():
+                self._pending_nodes.setdefault(node_id, value)
+            for key, value in links.items():
+                self._pending_links.setdefault(key, value)
+
+    def _mark_node(self, node_id: str, value: Optional[Tuple[str, str]]):
+        with self._cond:
+            self._pending_nodes[node_id] = value
+            self._cond.notify()
+
+    def _mark_link(self, key: str, value: Optional[Tuple[str, str, str]]):
+        with self._cond:
+            self._pending_links[key] = value
+            self._cond.notify()
+
+    def _has_pending(self) -> bool:
+        return bool(self._pending_nodes or self._pending_links or self._clear_pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._has_pending():
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Debounce: keep waiting while mutations keep arriving.
+                deadline = time.monotonic() + self.max_delay
+                while not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(min(self.debounce, remaining)):
+                        break
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("writing topology to %s failed, will retry", self.path)
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closed, self.max_delay)
+
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import threading
+from typing import Dict, List, Optional, Set
+
+
+TCP_LISTEN = "0A"
+UDP_UNCONNECTED = "07"
+
+
+def _proc_net_path(name: str, pid: Optional[int]) -> str:
+    # /proc/<pid>/net reflects the network namespace of that process.
+    if pid and pid > 0:
+        return os.path.join("/proc", str(pid), "net", name)
+    return os.path.join("/proc", "net", name)
+
+
+def listening_ports(pid: Optional[int] = None, udp: bool = False) -> Set[int]:
+    """Ports bound for listening in the network namespace of ``pid``."""
+    names = ("udp", "udp6") if udp else ("tcp", "tcp6")
+    state = UDP_UNCONNECTED if udp else TCP_LISTEN
+    ports = set()
+    for name in names:
+        try:
+            with open(_proc_net_path(name, pid), "r", encoding="ascii") as stream:
+                next(stream, None)
+                for line in stream:
+                    fields = line.split(None, 4)
+                    if len(fields) >= 4 and fields[3] == state:
+                        ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+        except (OSError, ValueError, IndexError):
+            continue
+    return ports
+
+
+async def wait_for_port(pid: Optional[int], port: int, udp: bool = False, timeout: float = 5.0,
+                        interval: float = 0.05) -> bool:
+    """Poll until ``port`` is listening in the namespace of ``pid``."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        if port in listening_ports(pid, udp):
+            return True
+        if loop.time() >= deadline:
+            return False
+        await asyncio.sleep(interval)
+
+
+CONTROLLER_PORT_RANGES = (range(6633, 6638), range(6653, 6658))
+
+
+class PortAllocator:
+    """Hands out controller ports without racing against other allocations.
+
+    Free ports are determined from ``/proc/net/tcp{,6}`` plus a reservation
+    table of ports handed out to an owner (a controller name) that may not be
+    listening yet, e.g. while the network is stopped. A reservation lasts
+    until the owner releases it.
+    """
+
+    def __init__(self, ranges=CONTROLLER_PORT_RANGES):
+        self.ranges = ranges
+        self._reserved: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, owner: str, preferred: Optional[int] = None) -> Optional[int]:
+        """Reserve ``preferred`` for ``owner`` if it is free, else the first free port in range."""
+        with self._lock:
+            listening = listening_ports()
+            held = self.owned(owner)
+
+            def available(port: int) -> bool:
+                return port not in listening and self._reserved.get(port, owner) == owner
+
+            if preferred and available(preferred):
+                port = preferred
+            else:
+                port = next((port for rng in self.ranges for port in rng if available(port)), None)
+                if port is None:
+                    return None
+            for old in held:
+                if old != port:
+                    del self._reserved[old]
+            self._reserved[port] = owner
+            return port
+
+    def owned(self, owner: str) -> List[int]:
+        return [port for port, holder in self._reserved.items() if holder == owner]
+
+    def release(self, owner: str):
+        with self._lock:
+            for port in self.owned(owner):
+                del self._reserved[port]
+
+    def clear(self):
+        with self._lock:
+            self._reserved.clear()
+
+    def reservations(self) -> Dict[int, str]:
+        return dict(self._reserved)
@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+NODE_KINDS = ("controllers", "switches", "hosts", "nats", "routers")
+
+LOOPBACK_INTFS = ("lo", "lo0")
+
+
+class NodeRegistry:
+    """Constant-time indexes over the topology node models.
+
+    The per-kind dicts returned by :meth:`collection` are the ones exposed as
+    ``app.hosts``, ``app.switches``, etc. They are kept in sync with the
+    by-id index as long as nodes are added and removed through the registry.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, BaseModel] = {}
+        self._kind: Dict[str, str] = {}
+        self._by_kind: Dict[str, Dict[str, BaseModel]] = {kind: {} for kind in NODE_KINDS}
+        self._intfs: Dict[str, List[str]] = {}
+        self.revision = 0
+
+    def touch(self):
+        """Bump the revision after a node model was changed in place."""
+        self.revision += 1
+
+    def collection(self, kind: str) -> Dict[str, BaseModel]:
+        return self._by_kind[kind]
+
+    def add(self, kind: str, node: BaseModel):
+        node_id = node.name
+        previous = self._kind.get(node_id)
+        if previous and previous != kind:
+            self._by_kind[previous].pop(node_id, None)
+        self._by_id[node_id] = node
+        self._kind[node_id] = kind
+        self._by_kind[kind][node_id] = node
+        self.revision += 1
+
+    def remove(self, node_id: str) -> Optional[BaseModel]:
+        node = self._by_id.pop(node_id, None)
+        kind = self._kind.pop(node_id, None)
+        if kind:
+            self._by_kind[kind].pop(node_id, None)
+        self._intfs.pop(node_id, None)
+        self.revision += 1
+        return node
+
+    def get(self, node_id: str) -> Optional[BaseModel]:
+        return self._by_id.get(node_id)
+
+    def kind_of(self, node_id: str) -> Optional[str]:
+        return self._kind.get(node_id)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def clear(self):
+        self._by_id.clear()
+        self._kind.clear()
+        for collection in self._by_kind.values():
+            collection.clear()
+        self._intfs.clear()
+        self.revision += 1
+
+    def interfaces(self, node) -> List[str]:
+        """Non-loopback interface names of a Mininet node, cached until invalidated."""
+        intfs = self._intfs.get(node.name)
+        if intfs is None:
+            intfs = [i.name for i in node.intfList() if i.name and i.name not in LOOPBACK_INTFS]
+            self._intfs[node.name] = intfs
+        return intfs
+
+    def invalidate_interfaces(self, *node_ids: str):
+        if not node_ids:
+            self._intfs.clear()
+            return
+        for node_id in node_ids:
+            self._intfs.pop(node_id, None)
@@ -0,0 +1,76 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+REPLAN_DEBOUNCE = 0.2
+
+
+class Replanner:
+    """Re-runs a planning step in the background after topology changes.
+
+    While enabled, :meth:`mark` schedules a call to ``replan`` on the
+    planner thread ``debounce`` seconds after the last change, so a burst
+    of link edits results in a single recomputation.
+    """
+
+    def __init__(self, replan: Callable[[], dict], name: str = "replanner", debounce: float = REPLAN_DEBOUNCE):
+        self._replan = replan
+        self.name = name
+        self.debounce = debounce
+        self.enabled = False
+        self._dirty = False
+        self._last: Optional[dict] = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+        if enabled:
+            self.mark()
+
+    def mark(self):
+        if self.enabled:
+            with self._lock:
+                self._dirty = True
+            self._wake.set()
+
+    def state(self) -> dict:
+        return {"enabled": self.enabled, "pending": self._dirty, "last": self._last, "error": self._error}
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            # Let a burst of changes settle before planning.
+            while self._wake.is_set() and not self._stop.is_set():
+                self._wake.clear()
+                self._stop.wait(self.debounce)
+            if self._stop.is_set():
+                break
+            with self._lock:
+                # A mark() arriving from here on plans again afterwards.
+                dirty, self._dirty = self._dirty, False
+            if not (self.enabled and dirty):
+                continue
+            try:
+                self._last = {**self._replan(), "at": time.time()}
+                self._error = None
+            except Exception as exc:
+                self._error = str(exc)
@@ -0,0 +1,294 @@
+import asyncio
+import ipaddress
+import re
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from mininet_gui_backend.netstate import NETSTATE_CONCURRENCY, NETSTATE_TIMEOUT, async_read_netstate
+from mininet_gui_backend.parsing import Route, format_route
+from mininet_gui_backend.utils import namespace_command
+
+
+ROUTE_BATCH_COMMAND = ["ip", "-force", "-batch", "-"]
+BATCH_FAILED_RE = re.compile(r"^Command failed -:(\d+)$")
+
+# Routes the kernel installs for connected subnets; never removed by a sync.
+UNMANAGED_PROTOCOLS = frozenset(("kernel",))
+# Protocol number (unassigned in rt_protos) tagging routes of the planner,
+# whose syncs leave every route without it alone.
+PLANNER_PROTO = "177"
+
+# (pid, desired routes) of a node taking part in a sync.
+RouteTarget = Tuple[Optional[int], List[Route]]
+
+# Node types with an IP stack; everything else linked (switches) is layer 2.
+L3_NODE_TYPES = frozenset(("host", "router", "nat"))
+# Node types that forward packets for others.
+FORWARDING_NODE_TYPES = frozenset(("router",))
+# Node types the planner writes route tables for.
+PLANNED_NODE_TYPES = frozenset(("host", "router"))
+
+
+def normalize_dst(dst: str) -> str:
+    """``default`` or an IPv4 network in the form ``ip -json route`` prints it."""
+    dst = (dst or "").strip()
+    if dst in ("default", "0.0.0.0/0"):
+        return "default"
+    network = ipaddress.ip_network(dst, strict=False)
+    if network.version != 4:
+        raise ValueError(f"only IPv4 routes are supported: {dst}")
+    return str(network.network_address) if network.prefixlen == 32 else str(network)
+
+
+def normalize_route(route: dict) -> Route:
+    """Validate a desired route and fill in the keys of :class:`Route`."""
+    via = (route.get("via") or "").strip() or None
+    dev = (route.get("dev") or "").strip() or None
+    src = (route.get("src") or "").strip() or None
+    if via is None and dev is None:
+        raise ValueError(f"route to {route.get('dst')} needs a gateway or a device")
+    for value in (via, src):
+        if value is not None and ipaddress.ip_address(value).version != 4:
+            raise ValueError(f"only IPv4 routes are supported: {value}")
+    return {
+        "dst": normalize_dst(route.get("dst")),
+        "via": via,
+        "dev": dev,
+        "proto": None,
+        "scope": None,
+        "src": src,
+        "metric": route.get("metric") or None,
+    }
+
+
+def route_matches(desired: Route, current: Route) -> bool:
+    """Whether ``current`` already satisfies ``desired``; unset desired keys match anything."""
+    if desired["dst"] != current["dst"] or (desired["metric"] or None) != (current["metric"] or None):
+        return False
+    return all(desired[key] is None or desired[key] == current[key] for key in ("via", "dev", "src", "proto"))
+
+
+def route_args(route: Route) -> str:
+    parts = [route["dst"]]
+    for key in ("via", "dev", "proto", "src", "metric"):
+        if route.get(key):
+            parts.extend((key, str(route[key])))
+    return " ".join(parts)
+
+
+def diff_routes(current: List[Route], desired: List[Route], owner: Optional[str] = None) -> dict:
+    """Batch lines turning ``current`` into ``desired``.
+
+    Routes in the current table are removed unless they are kernel routes
+    for connected subnets or satisfy a desired route; with an ``owner``
+    only routes of that protocol are removed at all. Desired routes that
+    are not satisfied yet are installed with ``route replace``, so a route
+    to the same destination is updated in place.
+    """
+    current = [
+        {**route, "dst": normalize_dst(route["dst"])} for route in current if route.get("dst")
+    ]
+    missing = [route for route in desired if not any(route_matches(route, have) for have in current)]
+    stale = [
+        route
+        for route in current
+        if route["proto"] not in UNMANAGED_PROTOCOLS
+        and (owner is None or route["proto"] == owner)
+        and not any(route_matches(want, route) for want in desired)
+        # A replace of the same destination and metric takes its place.
+        and not any(want["dst"] == route["dst"] and (want["metric"] or None) == (route["metric"] or None) for want in missing)
+    ]
+    commands = [f"route del {route_args(route)}" for route in stale]
+    commands.extend(f"route replace {route_args(route)}" for route in missing)
+    return {
+        "add": [format_route(route) for route in missing],
+        "remove": [format_route(route) for route in stale],
+        "unchanged": len(desired) - len(missing),
+        "commands": commands,
+    }
+
+
+def parse_batch_errors(commands: List[str], stderr: str) -> List[dict]:
+    """Failed batch lines with the message ``ip`` printed before each of them."""
+    errors = []
+    message: List[str] = []
+    for line in stderr.splitlines():
+        match = BATCH_FAILED_RE.match(line.strip())
+        if match is None:
+            if line.strip():
+                message.append(line.strip())
+            continue
+        index = int(match.group(1)) - 1
+        errors.append({
+            "command": commands[index] if 0 <= index < len(commands) else None,
+            "error": " ".join(message) or "failed",
+        })
+        message = []
+    if message:
+        errors.append({"command": None, "error": " ".join(message)})
+    return errors
+
+
+async def apply_route_batch(pid: Optional[int], commands: List[str], timeout: float = NETSTATE_TIMEOUT) -> List[dict]:
+    """Run ``commands`` in one ``ip -batch`` inside the namespace of ``pid``; returns the failures."""
+    if not commands:
+        return []
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *namespace_command(pid, ROUTE_BATCH_COMMAND),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as exc:
+        return [{"command": None, "error": str(exc)}]
+    batch = "".join(f"{command}\n" for command in commands).encode()
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(batch), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return [{"command": None, "error": "ip -batch timed out"}]
+    except asyncio.CancelledError:
+        process.kill()
+        raise
+    return parse_batch_errors(commands, stderr.decode(errors="ignore"))
+
+
+async def sync_routes(
+    pid: Optional[int], desired: List[Route], dry_run: bool = False, owner: Optional[str] = None
+) -> dict:
+    """Diff the route table of one namespace against ``desired`` and apply the difference."""
+    state = await async_read_netstate(pid)
+    if state["error"]:
+        return {"status": "failed", "error": state["error"], "add": [], "remove": [], "unchanged": 0, "errors": []}
+    diff = diff_routes(state["routes"], desired, owner)
+    commands = diff.pop("commands")
+    errors = [] if dry_run else await apply_route_batch(pid, commands)
+    return {
+        "status": "planned" if dry_run else ("partial" if errors else "ok"),
+        "error": None,
+        **diff,
+        "errors": errors,
+    }
+
+
+async def sync_route_tables(
+    targets: Dict[str, RouteTarget],
+    dry_run: bool = False,
+    owner: Optional[str] = None,
+    concurrency: int = NETSTATE_CONCURRENCY,
+) -> Dict[str, dict]:
+    """:func:`sync_routes` for many nodes at once, keyed by node name."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def sync(pid: Optional[int], desired: List[Route]) -> dict:
+        async with semaphore:
+            return await sync_routes(pid, desired, dry_run, owner)
+
+    results = await asyncio.gather(*(sync(pid, desired) for pid, desired in targets.values()))
+    return dict(zip(targets, results))
+
+
+def _l3_adjacency(nodes: List[dict], edges: List[dict]) -> Tuple[Dict[str, Dict[str, Tuple[str, str]]], Dict[str, set]]:
+    """Layer 3 neighbours and the owners of every connected IPv4 network.
+
+    Interfaces joined by links, directly or through switches, form a
+    broadcast domain; two nodes are neighbours when they have addresses in
+    the same network on the same domain. Neighbours map to the ``(via, dev)``
+    used to reach them.
+    """
+    l3 = {node["id"] for node in nodes if node["type"] in L3_NODE_TYPES}
+    parent: Dict[tuple, tuple] = {}
+
+    def find(port: tuple) -> tuple:
+        root = parent.setdefault(port, port)
+        while root != parent[root]:
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        return root
+
+    def port(node_id: str, intf: str) -> tuple:
+        # A switch is a single broadcast domain whatever port a link uses.
+        return (node_id, intf) if node_id in l3 else (node_id, None)
+
+    for edge in edges:
+        intfs = edge.get("intfs")
+        if intfs:
+            a, b = find(port(edge["from"], intfs["from"])), find(port(edge["to"], intfs["to"]))
+            if a != b:
+                parent[a] = b
+
+    domains: Dict[tuple, Dict[str, List[Tuple[str, str, str]]]] = {}
+    owners: Dict[str, set] = {}
+    for node in nodes:
+        if node["id"] not in l3:
+            continue
+        for intf in node["intfs"]:
+            for cidr in intf.get("ipv4", []):
+                address = ipaddress.ip_interface(cidr)
+                network = normalize_dst(str(address.network))
+                owners.setdefault(network, set()).add(node["id"])
+                members = domains.setdefault(find((node["id"], intf["name"])), {}).setdefault(network, [])
+                members.append((node["id"], intf["name"], str(address.ip)))
+
+    adjacency: Dict[str, Dict[str, Tuple[str, str]]] = {node_id: {} for node_id in l3}
+    for networks in domains.values():
+        for members in networks.values():
+            members.sort()
+            for src, dev, _ in members:
+                for dst, _, ip in members:
+                    if dst != src and dst not in adjacency[src]:
+                        adjacency[src][dst] = (ip, dev)
+    return adjacency, owners
+
+
+def planned_route(dst: str, via: str, dev: str) -> Route:
+    return {"dst": dst, "via": via, "dev": dev, "proto": PLANNER_PROTO, "scope": None, "src": None, "metric": None}
+
+
+def plan_static_routes(nodes: List[dict], edges: List[dict]) -> Dict[str, List[Route]]:
+    """Shortest-path (hop count) static route tables for every host and router.
+
+    ``nodes`` are the entries of the addressing plan and ``edges`` the link
+    payloads of the topology. One breadth-first search per node covers all
+    destinations, so a plan costs O(N * (N + E)). Only routers are used as
+    transit; a host whose remote routes all leave through one gateway gets a
+    single default route. Planned routes carry :data:`PLANNER_PROTO`.
+    """
+    types = {node["id"]: node["type"] for node in nodes}
+    adjacency, owners = _l3_adjacency(nodes, edges)
+    neighbors = {node_id: sorted(peers) for node_id, peers in adjacency.items()}
+    tables: Dict[str, List[Route]] = {}
+    for src in sorted(adjacency):
+        if types[src] not in PLANNED_NODE_TYPES:
+            continue
+        distance = {src: 0}
+        first_hop: Dict[str, str] = {}
+        queue = deque([src])
+        while queue:
+            node_id = queue.popleft()
+            if node_id != src and types[node_id] not in FORWARDING_NODE_TYPES:
+                continue
+            for peer in neighbors[node_id]:
+                if peer not in distance:
+                    distance[peer] = distance[node_id] + 1
+                    first_hop[peer] = peer if node_id == src else first_hop[node_id]
+                    queue.append(peer)
+        routes = []
+        for network in sorted(owners):
+            reachable = [(distance[owner], owner) for owner in owners[network] if owner in distance]
+            if not reachable:
+                continue
+            hops, owner = min(reachable)
+            if hops == 0:
+                continue
+            via, dev = adjacency[src][first_hop[owner]]
+            routes.append(planned_route(network, via, dev))
+        gateways = {(route["via"], route["dev"]) for route in routes}
+        if types[src] == "host" and len(gateways) == 1:
+            via, dev = gateways.pop()
+            routes = [planned_route("default", via, dev)]
+        tables[src] = routes
+    return tables
+
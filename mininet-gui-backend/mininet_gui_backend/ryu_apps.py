@@ -0,0 +1,141 @@
+import importlib
+import os
+import pkgutil
+import subprocess
+import threading
+from typing import List, Optional, Tuple
+
+
+RYU_APP_POLL_SECONDS = 5.0
+
+
+class RyuAppCatalog:
+    """Cached list of the Ryu apps that can be passed to ryu-manager.
+
+    Building the list imports ``ryu.app``, runs ``ryu-manager --app-list``
+    and scans the app directories, so it is done once and then only again
+    when the modification time of one of the directories changes (an app
+    file was added, removed or renamed). A background thread polls the
+    directory mtimes, which costs a few ``stat`` calls per interval.
+    """
+
+    def __init__(self, app_dirs: Optional[List[str]] = None, poll_interval: float = RYU_APP_POLL_SECONDS):
+        self.app_dirs = app_dirs if app_dirs is not None else []
+        self.poll_interval = poll_interval
+        self._apps: Optional[List[str]] = None
+        self._fingerprint: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._package_dir: Optional[str] = None
+        self._package_apps: Optional[List[str]] = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ryu-app-catalog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def apps(self) -> List[str]:
+        apps = self._apps
+        if apps is None:
+            apps = self.refresh()
+        return apps
+
+    def refresh(self, force: bool = False) -> List[str]:
+        """Rebuild the list when an app directory changed, or unconditionally with ``force``."""
+        with self._lock:
+            if force:
+                self._package_dir = self._package_apps = None
+            dirs = self._dirs()
+            fingerprint = self._stat(dirs)
+            if force or self._apps is None or fingerprint != self._fingerprint:
+                self._apps = self._build(dirs)
+                self._fingerprint = fingerprint
+            return self._apps
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                pass
+            self._stop.wait(self.poll_interval)
+
+    def _dirs(self) -> List[str]:
+        dirs = []
+        for entry in os.environ.get("RYU_APP_DIRS", "").split(os.pathsep):
+            entry = entry.strip()
+            if entry:
+                dirs.append(entry)
+        dirs.extend(app_dir for app_dir in self.app_dirs if os.path.isdir(app_dir))
+        package_dir = self._load_package()
+        if package_dir:
+            dirs.append(package_dir)
+        return dirs
+
+    @staticmethod
+    def _stat(dirs: List[str]) -> Tuple:
+        stamps = []
+        for app_dir in dirs:
+            try:
+                stamps.append((app_dir, os.stat(app_dir).st_mtime_ns))
+            except OSError:
+                stamps.append((app_dir, None))
+        return tuple(stamps)
+
+    def _load_package(self) -> Optional[str]:
+        """Import ``ryu.app`` once and remember its directory and modules."""
+        if self._package_apps is None:
+            self._package_apps = []
+            try:
+                app_pkg = importlib.import_module("ryu.app")
+                if app_pkg and hasattr(app_pkg, "__path__"):
+                    for _finder, name, _ispkg in pkgutil.iter_modules(app_pkg.__path__):
+                        if name and not name.startswith("__"):
+                            self._package_apps.append(name)
+                    pkg_dir = os.path.dirname(app_pkg.__file__)
+                    if os.path.isdir(pkg_dir):
+                        self._package_dir = pkg_dir
+            except Exception:
+                pass
+        return self._package_dir
+
+    def _build(self, dirs: List[str]) -> List[str]:
+        apps = set(self._package_apps or ())
+        try:
+            result = subprocess.run(
+                ["ryu-manager", "--app-list"],
+                check=False,
+                capture_output=True,
+                text=True,
+                timeout=3,
+            )
+            if result.stdout:
+                for line in result.stdout.splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
+                    token = line.split()[0]
+                    if token.startswith("ryu.app."):
+                        apps.add(token[len("ryu.app."):])
+        except Exception:
+            pass
+
+        for app_dir in dirs:
+            try:
+                entries = os.listdir(app_dir)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.endswith(".py") and entry != "__init__.py":
+                    apps.add(entry[:-3])
+
+        return sorted(apps)
@@ -0,0 +1,399 @@
+import asyncio
+import fcntl
+import os
+import struct
+import termios
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+READ_SIZE = 64 * 1024
+MAX_PENDING = 256 * 1024
+MAX_INPUT_PENDING = 64 * 1024
+
+# Binary terminal protocol: every WebSocket message starts with one type
+# byte. DATA carries raw terminal bytes in both directions, RESIZE carries
+# rows and cols as big-endian uint16, PAUSE/RESUME have no payload.
+FRAME_DATA = 0x00
+FRAME_RESIZE = 0x01
+FRAME_PAUSE = 0x02
+FRAME_RESUME = 0x03
+
+
+def encode_frame(frame_type: int, payload: bytes = b"") -> bytes:
+    return bytes((frame_type,)) + payload
+
+
+def set_winsize(fd: int, rows: int, cols: int):
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+
+
+class PtyReader:
+    """Relays PTY output to an async ``send`` callback.
+
+    The master fd is registered with ``loop.add_reader`` so idle terminals
+    cost nothing. Output read while a send is in flight is coalesced into the
+    next send; once ``max_pending`` bytes are buffered, or while the client
+    has paused the stream, the reader stops watching the fd, so a slow
+    consumer throttles the PTY instead of growing memory.
+    """
+
+    def __init__(self, master_fd: int, read_size: int = READ_SIZE, max_pending: int = MAX_PENDING):
+        self.master_fd = master_fd
+        self._read_size = read_size
+        self._max_pending = max_pending
+        self._buffer = bytearray()
+        self._ready = asyncio.Event()
+        self._eof = False
+        self._paused = False
+        self._reading = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def pause(self):
+        self._paused = True
+        self._stop_reading()
+
+    def resume(self):
+        self._paused = False
+        if self._loop and not self._eof and len(self._buffer) < self._max_pending:
+            self._start_reading()
+        self._ready.set()
+
+    async def run(self, send: Callable[[bytes], Awaitable[None]]):
+        self._loop = asyncio.get_running_loop()
+        if not self._paused:
+            self._start_reading()
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                if self._buffer and not self._paused:
+                    data = bytes(self._buffer)
+                    self._buffer.clear()
+                    if not self._eof:
+                        self._start_reading()
+                    await send(data)
+                if self._eof and not self._buffer:
+                    break
+        finally:
+            self._stop_reading()
+
+    def _start_reading(self):
+        if not self._reading and not self._paused:
+            try:
+                self._loop.add_reader(self.master_fd, self._on_readable)
+            except (OSError, ValueError):
+                self._eof = True
+                self._ready.set()
+                return
+            self._reading = True
+
+    def _stop_reading(self):
+        if self._reading:
+            self._reading = False
+            try:
+                self._loop.remove_reader(self.master_fd)
+            except (OSError, ValueError):
+                pass
+
+    def _on_readable(self):
+        try:
+            chunk = os.read(self.master_fd, self._read_size)
+        except BlockingIOError:
+            return
+        except OSError:
+            # EIO once the shell exits, EBADF once the fd was closed.
+            chunk = b""
+        if not chunk:
+            self._eof = True
+            self._stop_reading()
+        else:
+            self._buffer += chunk
+            if len(self._buffer) >= self._max_pending:
+                self._stop_reading()
+        self._ready.set()
+
+
+SCROLLBACK_BYTES = 256 * 1024
+IDLE_TIMEOUT_SECONDS = 600.0
+REAP_INTERVAL_SECONDS = 30.0
+
+
+class TerminalSession:
+    """A node shell that outlives WebSocket connections.
+
+    Output is kept in a bounded scrollback buffer and fanned out to every
+    attached client; a client attaching later first receives the scrollback.
+    Ephemeral sessions are closed as soon as their last client detaches.
+
+    Input is written to the non-blocking master fd from the event loop;
+    whatever the shell does not take yet waits in a buffer of at most
+    ``max_input`` bytes, and :meth:`write` blocks its caller while the
+    buffer is full. Output stays paused while any client has paused it.
+    """
+
+    def __init__(self, node_id: str, name: str, master_fd: int, process, persistent: bool = True,
+                 scrollback_bytes: int = SCROLLBACK_BYTES, max_input: int = MAX_INPUT_PENDING):
+        self.node_id = node_id
+        self.name = name
+        self.master_fd = master_fd
+        os.set_blocking(master_fd, False)
+        self.process = process
+        self.persistent = persistent
+        self.reader = PtyReader(master_fd)
+        self.created_at = time.time()
+        self.last_active = time.monotonic()
+        self._scrollback = bytearray()
+        self._scrollback_bytes = scrollback_bytes
+        self._clients: Dict[int, Callable[[bytes], Awaitable[None]]] = {}
+        self._next_token = 0
+        self._paused_by: Set[int] = set()
+        self._input = bytearray()
+        self._max_input = max_input
+        self._input_drained = asyncio.Event()
+        self._input_drained.set()
+        self._writing = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    @property
+    def attached(self) -> int:
+        return len(self._clients)
+
+    def start(self, on_exit: Callable[["TerminalSession"], None]):
+        self._loop = asyncio.get_running_loop()
+
+        async def run():
+            try:
+                await self.reader.run(self._broadcast)
+            finally:
+                self.close()
+                on_exit(self)
+
+        self._task = asyncio.create_task(run())
+
+    async def attach(self, send: Callable[[bytes], Awaitable[None]]) -> int:
+        """Register a client, replay the scrollback to it and return its token."""
+        lock = asyncio.Lock()
+
+        async def ordered_send(data: bytes):
+            async with lock:
+                await send(data)
+
+        # Holding the lock while replaying keeps live output queued behind
+        # the scrollback for this client.
+        async with lock:
+            self._next_token += 1
+            token = self._next_token
+            self._clients[token] = ordered_send
+            self.last_active = time.monotonic()
+            if self._scrollback:
+                await send(bytes(self._scrollback))
+        return token
+
+    def detach(self, token: int):
+        self._clients.pop(token, None)
+        self.resume(token)
+        self.last_active = time.monotonic()
+
+    def pause(self, token: int):
+        """Stop reading output until every client that paused it resumes or detaches."""
+        self._paused_by.add(token)
+        self.reader.pause()
+
+    def resume(self, token: int):
+        if token not in self._paused_by:
+            return
+        self._paused_by.discard(token)
+        if not self._paused_by and not self.closed:
+            self.reader.resume()
+
+    async def write(self, data: bytes):
+        """Queue ``data`` for the shell, waiting while the input buffer is full."""
+        self.last_active = time.monotonic()
+        while len(self._input) >= self._max_input and not self.closed:
+            self._input_drained.clear()
+            await self._input_drained.wait()
+        if self.closed:
+            return
+        self._input += data
+        self._flush_input()
+
+    def _flush_input(self):
+        try:
+            written = os.write(self.master_fd, self._input) if self._input else 0
+        except BlockingIOError:
+            written = 0
+        except OSError:
+            # The shell is gone; the reader sees EOF and closes the session.
+            written = len(self._input)
+        del self._input[:written]
+        if self._input and not self._writing:
+            self._loop.add_writer(self.master_fd, self._flush_input)
+            self._writing = True
+        elif not self._input:
+            self._stop_writing()
+        if len(self._input) < self._max_input:
+            self._input_drained.set()
+
+    def _stop_writing(self):
+        if self._writing:
+            self._writing = False
+            try:
+                self._loop.remove_writer(self.master_fd)
+            except (OSError, ValueError):
+                pass
+
+    def resize(self, rows: int, cols: int):
+        set_winsize(self.master_fd, rows, cols)
+
+    async def wait_closed(self):
+        await self._closed.wait()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self.reader.pause()
+        self._stop_writing()
+        self._input.clear()
+        self._input_drained.set()
+        if self._task and not self._task.done() and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._clients.clear()
+        try:
+            self.process.terminate()
+        except Exception:
+            pass
+        try:
+            self.process.wait(timeout=0.1)
+        except Exception:
+            pass
+        try:
+            os.close(self.master_fd)
+        except OSError:
+            pass
+
+    def info(self) -> dict:
+        return {
+            "node": self.node_id,
+            "name": self.name,
+            "pid": getattr(self.process, "pid", None),
+            "persistent": self.persistent,
+            "attached": self.attached,
+            "scrollback": len(self._scrollback),
+            "created_at": datetime.fromtimestamp(self.created_at, timezone.utc).isoformat().replace("+00:00", "Z"),
+            "idle_seconds": round(time.monotonic() - self.last_active, 1) if not self._clients else 0.0,
+        }
+
+    async def _broadcast(self, data: bytes):
+        self._scrollback += data
+        overflow = len(self._scrollback) - self._scrollback_bytes
+        if overflow > 0:
+            del self._scrollback[:overflow]
+        for token, send in list(self._clients.items()):
+            try:
+                await send(data)
+            except Exception:
+                self._clients.pop(token, None)
+
+
+class TerminalManager:
+    """Named terminal sessions per node, with an idle-timeout reaper.
+
+    ``spawn`` receives a node id and returns ``(master_fd, process)`` for a
+    new shell running inside that node.
+    """
+
+    def __init__(
+        self,
+        spawn: Callable[[str], Tuple[int, object]],
+        idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+        scrollback_bytes: int = SCROLLBACK_BYTES,
+    ):
+        self._spawn = spawn
+        self.idle_timeout = idle_timeout
+        self._scrollback_bytes = scrollback_bytes
+        self._sessions: Dict[Tuple[str, str], TerminalSession] = {}
+        self._reaper_task: Optional[asyncio.Task] = None
+
+    def get(self, node_id: str, name: str) -> Optional[TerminalSession]:
+        return self._sessions.get((node_id, name))
+
+    def open(self, node_id: str, name: Optional[str] = None) -> TerminalSession:
+        """Return the live session ``name`` of a node, spawning it if needed.
+
+        Without a name an ephemeral session is created.
+        """
+        if name:
+            session = self._sessions.get((node_id, name))
+            if session and not session.closed:
+                return session
+        persistent = bool(name)
+        name = name or uuid.uuid4().hex
+        master_fd, process = self._spawn(node_id)
+        session = TerminalSession(
+            node_id, name, master_fd, process, persistent=persistent, scrollback_bytes=self._scrollback_bytes
+        )
+        self._sessions[(node_id, name)] = session
+        session.start(self._forget)
+        self._ensure_reaper()
+        return session
+
+    def release(self, session: TerminalSession, token: int):
+        session.detach(token)
+        if not session.persistent and not session.attached:
+            self.kill(session.node_id, session.name)
+
+    def list(self, node_id: Optional[str] = None) -> List[dict]:
+        return [
+            session.info()
+            for (session_node, _name), session in self._sessions.items()
+            if node_id is None or session_node == node_id
+        ]
+
+    def kill(self, node_id: str, name: str) -> bool:
+        session = self._sessions.pop((node_id, name), None)
+        if not session:
+            return False
+        session.close()
+        return True
+
+    def kill_all(self):
+        for node_id, name in list(self._sessions):
+            self.kill(node_id, name)
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+
+    def reap(self):
+        now = time.monotonic()
+        for key, session in list(self._sessions.items()):
+            idle = not session.attached and now - session.last_active > self.idle_timeout
+            if session.closed or idle:
+                self.kill(*key)
+
+    def _forget(self, session: TerminalSession):
+        key = (session.node_id, session.name)
+        if self._sessions.get(key) is session:
+            del self._sessions[key]
+
+    def _ensure_reaper(self):
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_loop())
+
+    async def _reap_loop(self):
+        while self._sessions:
+            await asyncio.sleep(REAP_INTERVAL_SECONDS)
+            self.reap()
@@ -0,0 +1,363 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+
+from mininet_gui_backend.ports import listening_ports, wait_for_port
+from mininet_gui_backend.utils import namespace_command
+
+
+IPERF_BASE_PORT = 5001
+IPERF_MAX_FLOWS = 256
+SERVER_READY_TIMEOUT = 5.0
+MAX_FINISHED_CAMPAIGNS = 20
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+# (name, pid, ip) of a host taking part in a campaign.
+IperfHost = Tuple[str, int, Optional[str]]
+
+
+def campaign_pairs(pattern: str, hosts: List[str]) -> List[Tuple[str, str]]:
+    """Client/server pairs for a traffic pattern over ``hosts``."""
+    if pattern == "all-to-all":
+        return [(src, dst) for src, dst in itertools.permutations(hosts, 2)]
+    if pattern == "permutation":
+        # Every host sends to exactly one other host and receives from one.
+        if len(hosts) < 2:
+            return []
+        targets = list(hosts)
+        while True:
+            random.shuffle(targets)
+            if all(src != dst for src, dst in zip(hosts, targets)):
+                return list(zip(hosts, targets))
+    raise ValueError(f"unknown traffic pattern: {pattern}")
+
+
+def parse_iperf_csv(line: str) -> Optional[dict]:
+    """One ``iperf -y C`` report line; UDP server reports add jitter and loss."""
+    fields = line.strip().split(",")
+    if len(fields) < 9:
+        return None
+    try:
+        start, end = (float(value) for value in fields[6].split("-", 1))
+        sample = {
+            "start": start,
+            "end": end,
+            "bytes": int(fields[7]),
+            "bps": float(fields[8]),
+        }
+        if len(fields) >= 14:
+            sample.update(
+                jitter_ms=float(fields[9]),
+                lost=int(fields[10]),
+                total=int(fields[11]),
+                loss_pct=float(fields[12]),
+            )
+    except ValueError:
+        return None
+    return sample
+
+
+class IperfPortTable:
+    """Iperf server ports reserved per host by the flows that use them.
+
+    A port stays reserved from the moment a flow is planned until it ends,
+    so campaigns planned while others are still starting their servers never
+    hand out the same port of a host. Like :class:`PortAllocator`, ports in
+    ``busy`` (listening already) are skipped as well.
+    """
+
+    def __init__(self):
+        self._reserved: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, host: str, base_port: int, busy: Set[int]) -> int:
+        with self._lock:
+            reserved = self._reserved.setdefault(host, set())
+            port = base_port
+            while port in busy or port in reserved:
+                port += 1
+            reserved.add(port)
+            return port
+
+    def release(self, host: str, port: int):
+        with self._lock:
+            reserved = self._reserved.get(host)
+            if reserved is not None:
+                reserved.discard(port)
+                if not reserved:
+                    del self._reserved[host]
+
+    def reservations(self) -> Dict[str, List[int]]:
+        with self._lock:
+            return {host: sorted(ports) for host, ports in self._reserved.items()}
+
+
+class IperfFlow:
+    def __init__(self, flow_id: int, client: IperfHost, server: IperfHost, port: int):
+        self.id = flow_id
+        self.client = client
+        self.server = server
+        self.port = port
+        self.status = "pending"
+        self.result: Optional[dict] = None
+        self.last_sample: Optional[dict] = None
+        self.error: Optional[str] = None
+        # Whether the port went back to the port table.
+        self.released = False
+
+    def info(self) -> dict:
+        return {
+            "id": self.id,
+            "client": self.client[0],
+            "server": self.server[0],
+            "port": self.port,
+            "status": self.status,
+            "result": self.result,
+            "last_sample": self.last_sample,
+            "error": self.error,
+        }
+
+
+class IperfCampaign:
+    """Many iperf flows started at once, each with its own server port.
+
+    Servers are started in parallel and every client connects as soon as its
+    server is listening, so all flows overlap. Flows that share a server host
+    get consecutive ports starting at ``base_port``, skipping ports already
+    in use in that host or reserved in ``ports`` by other campaigns; each
+    port is released there as soon as its flow ends.
+
+    With an ``interval``, iperf reports every interval and each report is
+    pushed to the subscriber queues as it is read; for UDP the server side
+    reports, which carry jitter and loss, are streamed as well.
+    """
+
+    def __init__(
+        self,
+        hosts: List[IperfHost],
+        pairs: List[Tuple[str, str]],
+        l4_type: str = "TCP",
+        udp_bw: Optional[str] = None,
+        seconds: int = 5,
+        base_port: int = IPERF_BASE_PORT,
+        interval: Optional[float] = None,
+        ports: Optional[IperfPortTable] = None,
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.udp = (l4_type or "TCP").upper() == "UDP"
+        self.udp_bw = udp_bw or "10M"
+        self.seconds = max(1, seconds)
+        self.interval = max(0.5, interval) if interval else None
+        self.status = "pending"
+        self.created_at = time.time()
+        self.elapsed = 0.0
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._ports = ports if ports is not None else IperfPortTable()
+        by_name = {host[0]: host for host in hosts}
+        next_port: Dict[str, int] = {}
+        busy: Dict[str, set] = {}
+        self.flows: List[IperfFlow] = []
+        for flow_id, (client, server) in enumerate(pairs):
+            server_host = by_name[server]
+            if server not in busy:
+                busy[server] = listening_ports(server_host[1], self.udp)
+            port = self._ports.allocate(server, next_port.get(server, base_port), busy[server])
+            next_port[server] = port + 1
+            self.flows.append(IperfFlow(flow_id, by_name[client], server_host, port))
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "cancelled", "failed")
+
+    def start(self) -> asyncio.Task:
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def wait(self):
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if self.done:
+            queue.put_nowait({"type": "done", **self.summary()})
+        else:
+            self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _publish(self, message: dict):
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Interval samples are disposable, keep the newest ones.
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def run(self):
+        self.status = "running"
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*(self._run_flow(flow) for flow in self.flows))
+            self.status = "done"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            for flow in self.flows:
+                if flow.status in ("pending", "running"):
+                    flow.status = "cancelled"
+        except Exception as exc:
+            self.status = "failed"
+            self.error = str(exc)
+        finally:
+            # Flows cancelled before they started never released their port.
+            for flow in self.flows:
+                self._release(flow)
+            self.elapsed = time.monotonic() - started
+            self._publish({"type": "done", **self.summary()})
+            self._subscribers.clear()
+
+    def summary(self) -> dict:
+        finished = [flow.result for flow in self.flows if flow.result]
+        return {
+            "id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "l4_type": "UDP" if self.udp else "TCP",
+            "seconds": self.seconds,
+            "interval": self.interval,
+            "elapsed": round(self.elapsed, 3),
+            "flows": [flow.info() for flow in self.flows],
+            "aggregate_bps": sum(result["bps"] for result in finished),
+            "completed": len(finished),
+            "failed": sum(1 for flow in self.flows if flow.status == "failed"),
+        }
+
+    def _is_final(self, sample: dict) -> bool:
+        return self.interval is None or sample["end"] - sample["start"] > self.interval * 1.5
+
+    async def _read_reports(self, flow: IperfFlow, stream: asyncio.StreamReader, side: str) -> List[dict]:
+        samples = []
+        while True:
+            line = await stream.readline()
+            if not line:
+                return samples
+            sample = parse_iperf_csv(line.decode(errors="ignore"))
+            if not sample:
+                continue
+            samples.append(sample)
+            final = self._is_final(sample)
+            if not final:
+                flow.last_sample = sample
+            if self.interval is not None:
+                self._publish({
+                    "type": "sample",
+                    "flow": flow.id,
+                    "client": flow.client[0],
+                    "server": flow.server[0],
+                    "side": side,
+                    "final": final,
+                    **sample,
+                })
+
+    async def _run_flow(self, flow: IperfFlow):
+        server_cmd = ["iperf", "-s", "-p", str(flow.port), "-y", "C"]
+        client_cmd = ["iperf", "-c", flow.server[2], "-p", str(flow.port), "-t", str(self.seconds), "-y", "C"]
+        if self.udp:
+            server_cmd.append("-u")
+            client_cmd.extend(["-u", "-b", self.udp_bw])
+        if self.interval is not None:
+            server_cmd.extend(["-i", str(self.interval)])
+            client_cmd.extend(["-i", str(self.interval)])
+        stream_server = self.udp and self.interval is not None
+        server = client = server_reader = None
+        flow.status = "running"
+        try:
+            server = await asyncio.create_subprocess_exec(
+                *namespace_command(flow.server[1], server_cmd),
+                stdout=asyncio.subprocess.PIPE if stream_server else asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            if stream_server:
+                server_reader = asyncio.create_task(self._read_reports(flow, server.stdout, "server"))
+            if not await wait_for_port(flow.server[1], flow.port, self.udp, SERVER_READY_TIMEOUT):
+                raise RuntimeError(f"iperf server on {flow.server[0]}:{flow.port} did not start")
+            client = await asyncio.create_subprocess_exec(
+                *namespace_command(flow.client[1], client_cmd),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            samples = await self._read_reports(flow, client.stdout, "client")
+            stderr = (await client.stderr.read()).decode(errors="ignore").strip()
+            await client.wait()
+            finals = [sample for sample in samples if self._is_final(sample)] or samples[-1:]
+            if not finals:
+                raise RuntimeError(stderr or "iperf client produced no report")
+            # The UDP server report (with loss) follows the client report.
+            flow.result = finals[-1]
+            flow.status = "done"
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            flow.status = "failed"
+            flow.error = str(exc)
+        finally:
+            if server_reader is not None:
+                server_reader.cancel()
+            for process in (client, server):
+                if process is not None and process.returncode is None:
+                    process.kill()
+                    await process.wait()
+            self._release(flow)
+
+    def _release(self, flow: IperfFlow):
+        # Once released the port may belong to another campaign, so never twice.
+        if not flow.released:
+            flow.released = True
+            self._ports.release(flow.server[0], flow.port)
+
+
+class TrafficManager:
+    """Running and recently finished iperf campaigns."""
+
+    def __init__(self, max_flows: int = IPERF_MAX_FLOWS):
+        self.max_flows = max_flows
+        self.ports = IperfPortTable()
+        self._campaigns: Dict[str, IperfCampaign] = {}
+
+    def start(self, campaign: IperfCampaign) -> IperfCampaign:
+        self._prune()
+        self._campaigns[campaign.id] = campaign
+        campaign.start()
+        return campaign
+
+    def get(self, campaign_id: str) -> Optional[IperfCampaign]:
+        return self._campaigns.get(campaign_id)
+
+    def list(self) -> List[dict]:
+        return [
+            {"id": campaign.id, "status": campaign.status, "flows": len(campaign.flows), "created_at": campaign.created_at}
+            for campaign in self._campaigns.values()
+        ]
+
+    def active_flows(self) -> int:
+        return sum(len(campaign.flows) for campaign in self._campaigns.values() if not campaign.done)
+
+    def cancel_all(self):
+        for campaign in self._campaigns.values():
+            campaign.cancel()
+
+    def _prune(self):
+        finished = [campaign for campaign in self._campaigns.values() if campaign.done]
+        for campaign in finished[:-MAX_FINISHED_CAMPAIGNS or None]:
+            del self._campaigns[campaign.id]
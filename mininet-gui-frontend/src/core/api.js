@@ -222,6 +222,18 @@ export const deleteLink = async (srcId, dstId) => {
   }
 };
 
+export const killTerminalSession = async (nodeId, name) => {
+  try {
+    const response = await axios.delete(
+      baseUrl + `/api/mininet/terminals/${nodeId}/${encodeURIComponent(name)}`,
+    );
+    return response.status === 200;
+  } catch (error) {
+    console.warn("Failed to kill terminal session", error);
+    return false;
+  }
+};
+
 export const updateLinkOptions = async (src, dst, options = {}) => {
   try {
     const payload = { src, dst, options };
@@ -376,6 +388,25 @@ export const updateNodePosition = async (nodeId, position) => {
   }
 };
 
+export const updateNodePositions = async (positions) => {
+  try {
+    const response = await axios.post(
+      baseUrl + `/api/mininet/node_positions`,
+      JSON.stringify({"positions": positions}),
+      {
+        headers: {
+          "Access-Control-Allow-Origin": "*",
+          "Content-Type": "application/json",
+        },
+      },
+    );
+    return response.status === 200;
+  } catch (error) {
+    alert(error.response ? error.response.data["detail"] : "Network Error");
+    throw error;
+  }
+};
+
 export const requestStartNetwork = async () => {
   try {
     const response = await axios.post(